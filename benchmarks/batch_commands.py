@@ -0,0 +1,60 @@
+"""Throughput of UnifiedAgent.process_commands
+
+Run ``python benchmarks/batch_commands.py --commands 20000``. Streams the same
+number of commands through the full module + DecisionMaker pipeline at each
+concurrency level and reports commands/s, plus the sequential
+submit-and-wait baseline.
+"""
+import argparse
+import logging
+import time
+
+from agent_a.agent_controller import UnifiedAgent
+from agent_a.core import AgentA
+from agent_a.decision_maker import TERMINAL_STATUSES
+
+
+def sequential(agent: AgentA, commands: int) -> float:
+    start = time.perf_counter()
+    for i in range(commands):
+        task_ids = agent.submit_command(f"command {i}")
+        while any(agent.decision_maker.get_task_status(t) not in TERMINAL_STATUSES for t in task_ids):
+            time.sleep(0.0005)
+        agent.decision_maker.forget(task_ids)
+    return commands / (time.perf_counter() - start)
+
+
+def batched(unified: UnifiedAgent, commands: int, concurrency: int, ordered: bool) -> float:
+    start = time.perf_counter()
+    count = 0
+    for _ in unified.process_commands((f"command {i}" for i in range(commands)),
+                                      concurrency=concurrency, ordered=ordered):
+        count += 1
+    assert count == commands
+    return commands / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64, 256])
+    parser.add_argument("--ordered", action="store_true")
+    args = parser.parse_args()
+
+    agent = AgentA(log_mode="async")
+    logging.getLogger("agent_a").setLevel(logging.WARNING)
+    agent.initialize_components()
+    agent.decision_maker.start()
+    unified = UnifiedAgent(agent=agent)
+    try:
+        baseline_count = max(1, args.commands // 10)
+        print(f"{'sequential':>14}: {sequential(agent, baseline_count):10.0f} commands/s")
+        for concurrency in args.concurrency:
+            rate = batched(unified, args.commands, concurrency, args.ordered)
+            print(f"{'concurrency ' + str(concurrency):>14}: {rate:10.0f} commands/s")
+    finally:
+        agent.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Throughput of ClusterDecisionMaker as the number of worker processes grows
+
+Run ``python benchmarks/cluster_scaling.py --tasks 400 --work 200000``. The
+single-process DecisionMaker is measured first as the baseline.
+"""
+import argparse
+import os
+import threading
+import time
+
+from agent_a.cluster import ClusterDecisionMaker
+from agent_a.decision_maker import DecisionMaker
+
+
+def burn(context):
+    """CPU-bound task: pure Python arithmetic holds the GIL throughout"""
+    total = 0
+    for i in range(context["work"]):
+        total += i * i % 7
+    return total
+
+
+def run(decision_maker, tasks: int, work: int) -> float:
+    remaining = [tasks]
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def on_finished(task):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    decision_maker.add_listener(on_finished)
+    decision_maker.start()
+    if isinstance(decision_maker, ClusterDecisionMaker):
+        decision_maker.wait_ready()  # Don't time process start-up
+    start = time.perf_counter()
+    for _ in range(tasks):
+        decision_maker.add_task(burn, context={"work": work})
+    done.wait()
+    elapsed = time.perf_counter() - start
+    decision_maker.stop()
+    return tasks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=400)
+    parser.add_argument("--work", type=int, default=200000, help="Loop iterations per task")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1,
+                        help="Largest worker-process count to try")
+    args = parser.parse_args()
+
+    baseline = run(DecisionMaker(), args.tasks, args.work)
+    print(f"{'single process':>16}: {baseline:8.1f} tasks/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        cluster = ClusterDecisionMaker(num_workers=workers)
+        throughput = run(cluster, args.tasks, args.work)
+        print(f"{workers:>8} workers: {throughput:8.1f} tasks/s  ({throughput / baseline:.2f}x)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Time to replay and recover a large task journal
+
+Run ``python benchmarks/journal_recovery.py --entries 1000000``. The
+synthetic journal holds reasoning plans at random stages of completion, as a
+crashed process would leave them.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from agent_a.decision_maker import DecisionMaker
+from agent_a.journal import TaskJournal
+
+
+def write_journal(path: str, entries: int, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    steps = len(DecisionMaker.REASONING_STEPS)
+    written = 0
+    next_id = 1
+    with open(path, "w", encoding="utf-8") as f:
+        while written < entries:
+            task_ids = [f"task_{next_id + i}" for i in range(steps)]
+            next_id += steps
+            f.write(json.dumps({"op": "plan", "id": task_ids[0], "query": f"query {next_id}",
+                                "tasks": task_ids}) + "\n")
+            written += 1
+            for task_id in task_ids[:rng.randint(0, steps)]:
+                f.write(json.dumps({"op": "status", "id": task_id, "status": "RUNNING"}) + "\n")
+                f.write(json.dumps({"op": "status", "id": task_id, "status": "COMPLETED",
+                                    "result": {"step": task_id}}) + "\n")
+                written += 2
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "tasks.journal")
+        written = write_journal(path, args.entries)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"journal: {written} records, {size_mb:.1f} MB")
+
+        journal = TaskJournal(path)
+        start = time.perf_counter()
+        state = journal.replay()
+        replayed = time.perf_counter()
+        decision_maker = DecisionMaker(journal=journal)  # Replays again, restores and compacts
+        recovered = time.perf_counter()
+
+        pending = sum(1 for task in decision_maker.active_tasks.values()
+                      if task.status.name == "PENDING")
+        print(f"replay only: {replayed - start:.2f}s ({state.records / (replayed - start):,.0f} records/s)")
+        print(f"full recovery (replay + restore + compact): {recovered - replayed:.2f}s, "
+              f"{pending} pending tasks restored, compacted to {os.path.getsize(path) / 1e6:.1f} MB")
+        decision_maker.stop()
+
+
+if __name__ == "__main__":
+    main()
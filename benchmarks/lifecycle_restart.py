@@ -0,0 +1,65 @@
+"""Restart-to-ready and drain time of AgentA across repeated restarts
+
+Run ``python benchmarks/lifecycle_restart.py --restarts 5 --plans 2000``.
+Each cycle starts an agent (with a journal and a BM25 index, like a
+deployed one), submits ``--plans`` reasoning plans and drains it, then the
+next cycle starts on the same journal and index. Restart-to-ready is
+measured from the drain request of one agent to the next one being ready.
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+from agent_a.core import AgentA
+from agent_a.retrieval import BM25Index
+
+
+def build_index(path: str, docs: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(20_000)]
+    index = BM25Index(path)
+    index.add_documents(" ".join(rng.choices(vocabulary, k=40)) for _ in range(docs))
+    index.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--restarts", type=int, default=5)
+    parser.add_argument("--plans", type=int, default=2000, help="Plans in flight when each drain starts")
+    parser.add_argument("--docs", type=int, default=100_000, help="Index size (0 for no index)")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal_path = os.path.join(tmp, "journal.jsonl")
+        index_path = None
+        if args.docs:
+            index_path = os.path.join(tmp, "index")
+            build_index(index_path, args.docs)
+
+        print(f"{'cycle':>5} {'startup':>9} {'ready':>9} {'drain':>9} {'shutdown':>9} "
+              f"{'abandoned':>9} {'restart-to-ready':>16}")
+        drain_requested = None
+        for cycle in range(args.restarts):
+            agent = AgentA(journal_path=journal_path, index_path=index_path, log_mode="production")
+            logging.disable(logging.WARNING)
+            timings = agent.start()
+            restart = time.perf_counter() - drain_requested if drain_requested is not None else None
+
+            for i in range(args.plans):
+                agent.submit_command(f"cycle {cycle} command {i}")
+            drain_requested = time.perf_counter()
+            agent.drain(args.drain_timeout)
+
+            ms = lambda seconds: "-" if seconds is None else f"{seconds * 1000:.1f}"
+            print(f"{cycle:>5} {ms(timings.startup):>9} {ms(timings.ready):>9} {ms(timings.drain):>9} "
+                  f"{ms(timings.shutdown):>9} {timings.abandoned:>9} {ms(restart):>16}")
+        print("times in ms; restart-to-ready = drain + shutdown + construction + startup")
+        print(f"last cycle: {timings.summary()}")
+
+
+if __name__ == "__main__":
+    main()
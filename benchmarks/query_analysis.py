@@ -0,0 +1,81 @@
+"""Batched vs per-query analysis for the analyze_query step
+
+Run ``python benchmarks/query_analysis.py --queries 50000``. Reports
+queries/s for the per-query path (``analyze_query``) and for
+``analyze_queries`` at each batch size, then end-to-end plans/s through a
+DecisionMaker with the query batcher off and on.
+"""
+import argparse
+import random
+import threading
+import time
+
+from agent_a.decision_maker import DecisionMaker
+from agent_a.query_analysis import analyze_queries, analyze_query
+
+WORDS = ("find summarize latest report error budget deploy rollback cache latency "
+         "database index query user session token retry timeout cluster worker").split()
+
+
+def make_queries(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16))) for _ in range(count)]
+
+
+def per_query(queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        analyze_query(query)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def batched(queries, batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        analyze_queries(queries[i:i + batch_size])
+    return len(queries) / (time.perf_counter() - start)
+
+
+def plans(queries, window) -> float:
+    decision_maker = DecisionMaker(query_batch_window=window)
+    remaining = [len(queries)]
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def on_finished(task):
+        if task.name == "analyze_query":
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    done.set()
+
+    decision_maker.add_listener(on_finished)
+    decision_maker.start()
+    start = time.perf_counter()
+    for query in queries:
+        decision_maker.create_reasoning_plan(query)
+    done.wait()
+    elapsed = time.perf_counter() - start
+    decision_maker.stop()
+    return len(queries) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=50000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 512, 4096])
+    parser.add_argument("--plans", type=int, default=5000)
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    print(f"{'per-query':>16}: {per_query(queries):10.0f} queries/s")
+    for batch_size in args.batch_sizes:
+        print(f"{'batch ' + str(batch_size):>16}: {batched(queries, batch_size):10.0f} queries/s")
+
+    sample = queries[:args.plans]
+    print(f"{'plans, unbatched':>16}: {plans(sample, None):10.0f} analyze steps/s")
+    print(f"{'plans, batched':>16}: {plans(sample, 0.002):10.0f} analyze steps/s")
+
+
+if __name__ == "__main__":
+    main()
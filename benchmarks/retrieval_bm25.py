@@ -0,0 +1,91 @@
+"""Build time and query latency of the BM25 index on a synthetic corpus
+
+Run ``python benchmarks/retrieval_bm25.py --gb 2 --dir /tmp/bm25``. Generates
+documents with Zipf-distributed words until ``--gb`` gigabytes of text have
+been indexed, then reports build throughput, on-disk size, the time to open
+(memory-map) the index and query latency percentiles.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import time
+
+import numpy as np
+
+from agent_a.retrieval import BM25Index
+
+
+def vocabulary(size: int, rng: np.random.Generator):
+    letters = np.frombuffer(b"abcdefghijklmnopqrstuvwxyz", dtype=np.uint8)
+    lengths = rng.integers(3, 11, size)
+    return [letters[rng.integers(0, 26, n)].tobytes().decode() for n in lengths]
+
+
+def documents(words, total_bytes: int, doc_words: int, rng: np.random.Generator):
+    """Yield documents until ``total_bytes`` of text have been produced"""
+    produced = 0
+    while produced < total_bytes:
+        ranks = np.minimum(rng.zipf(1.2, doc_words * 1000), len(words)) - 1
+        for start in range(0, len(ranks), doc_words):
+            text = " ".join([words[i] for i in ranks[start:start + doc_words]])
+            produced += len(text)
+            yield text
+            if produced >= total_bytes:
+                return
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gb", type=float, default=2.0)
+    parser.add_argument("--dir", default="bm25-bench")
+    parser.add_argument("--vocab", type=int, default=200_000)
+    parser.add_argument("--doc-words", type=int, default=150)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--merge", action="store_true", help="Also time merging into one segment")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    words = vocabulary(args.vocab, rng)
+    shutil.rmtree(args.dir, ignore_errors=True)
+
+    index = BM25Index(args.dir)
+    total = int(args.gb * (1 << 30))
+    start = time.perf_counter()
+    for text in documents(words, total, args.doc_words, rng):
+        index.add_documents([text])
+    index.flush()
+    build = time.perf_counter() - start
+    print(f"build: {len(index)} docs, {total / (1 << 20):.0f} MiB in {build:.1f}s "
+          f"({total / (1 << 20) / build:.1f} MiB/s), {len(index._segments)} segments, "
+          f"{directory_size(args.dir) / (1 << 20):.0f} MiB on disk")
+
+    if args.merge:
+        start = time.perf_counter()
+        index.merge()
+        print(f"merge: {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index = BM25Index(args.dir)
+    print(f"open:  {(time.perf_counter() - start) * 1000:.1f} ms (memory-mapped)")
+
+    # Queries mix frequent and rare words, 2-4 terms each
+    latencies = []
+    for _ in range(args.queries):
+        terms = [words[min(int(rng.zipf(1.1)), len(words)) - 1] for _ in range(rng.integers(2, 5))]
+        start = time.perf_counter()
+        index.search(" ".join(terms), k=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"query: p50 {statistics.median(latencies):.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms, max {latencies[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
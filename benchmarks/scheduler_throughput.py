@@ -0,0 +1,93 @@
+"""End-to-end DecisionMaker throughput on trivial tasks
+
+Run ``python benchmarks/scheduler_throughput.py --tasks 20000``. Each
+configuration submits the same number of no-op tasks from ``--submitters``
+threads and reports tasks/s: first with the task journal off and on (with
+the journal, every submission waits until its record is committed, and
+concurrent submitters share group commits), then under each logging preset
+(log output goes to a sink that sleeps ``--sink-latency-us`` per write,
+standing in for a terminal or a pipe that is slow to drain).
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from agent_a.decision_maker import DecisionMaker
+from agent_a.journal import TaskJournal
+from agent_a.logging_setup import PRESETS, configure_logging, shutdown_logging
+
+
+def noop(context):
+    return None
+
+
+class SlowSink:
+    """Write target that takes a fixed time per write, like a busy stderr pipe"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def write(self, data):
+        time.sleep(self.latency)
+
+    def flush(self):
+        pass
+
+
+def run(tasks: int, submitters: int, journal: TaskJournal = None) -> float:
+    decision_maker = DecisionMaker(journal=journal)
+    remaining = [tasks]
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def on_finished(task):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    decision_maker.add_listener(on_finished)
+    decision_maker.start()
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=lambda n: [decision_maker.add_task(noop) for _ in range(n)],
+                         args=(tasks // submitters + (i < tasks % submitters),))
+        for i in range(submitters)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.wait()
+    elapsed = time.perf_counter() - start
+    decision_maker.stop()
+    return tasks / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--submitters", type=int, default=16)
+    parser.add_argument("--sink-latency-us", type=float, default=20.0)
+    args = parser.parse_args()
+
+    print(f"{'journal off':>24}: {run(args.tasks, args.submitters):10.1f} tasks/s")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fsync in (False, True):
+            path = os.path.join(tmpdir, f"fsync-{fsync}.journal")
+            throughput = run(args.tasks, args.submitters, TaskJournal(path, fsync=fsync))
+            label = "journal on (group fsync)" if fsync else "journal on (no fsync)"
+            print(f"{label:>24}: {throughput:10.1f} tasks/s")
+
+    sink = SlowSink(args.sink_latency_us / 1e6)
+    for mode in PRESETS:
+        configure_logging(mode, stream=sink)
+        throughput = run(args.tasks, args.submitters)
+        shutdown_logging()  # Background writes may lag behind; drain before the next run
+        print(f"{'logging ' + mode:>24}: {throughput:10.1f} tasks/s")
+
+
+if __name__ == "__main__":
+    main()
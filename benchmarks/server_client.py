@@ -0,0 +1,87 @@
+"""Load generator for the headless AgentServer
+
+Start a server first, e.g. ``python -m agent_a.server --port 8765``, then run
+``python benchmarks/server_client.py --clients 32 --requests 200 --pipeline 8``.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+
+async def run_client(args, latencies: List[float], errors: List[str]):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+
+    started = {}
+    window = asyncio.Semaphore(args.pipeline)
+
+    async def send_requests():
+        for i in range(args.requests):
+            await window.acquire()
+            started[i] = time.perf_counter()
+            writer.write(json.dumps({"id": i, "command": args.command}).encode() + b"\n")
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+
+    sender = asyncio.ensure_future(send_requests())
+    finished = 0
+    while finished < args.requests:
+        line = await reader.readline()
+        if not line:
+            errors.append("connection closed early")
+            break
+        message = json.loads(line)
+        if message.get("event") in ("done", "error"):
+            if message["event"] == "error":
+                errors.append(message.get("error", "unknown error"))
+            request_id = message.get("id")
+            if request_id in started:
+                latencies.append(time.perf_counter() - started.pop(request_id))
+            finished += 1
+            window.release()
+
+    await sender
+    writer.close()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def main(args):
+    latencies: List[float] = []
+    errors: List[str] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(args, latencies, errors) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    total = len(latencies)
+    print(f"clients={args.clients} pipeline={args.pipeline} requests={total} errors={len(errors)}")
+    print(f"elapsed={elapsed:.2f}s throughput={total / elapsed:.1f} req/s")
+    if latencies:
+        print(
+            "latency ms: "
+            f"mean={statistics.mean(latencies) * 1000:.1f} "
+            f"p50={percentile(latencies, 50) * 1000:.1f} "
+            f"p95={percentile(latencies, 95) * 1000:.1f} "
+            f"p99={percentile(latencies, 99) * 1000:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client")
+    parser.add_argument("--pipeline", type=int, default=4, help="In-flight requests per client")
+    parser.add_argument("--command", default="benchmark query")
+    asyncio.run(main(parser.parse_args()))
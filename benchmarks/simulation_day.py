@@ -0,0 +1,41 @@
+"""Capacity planning sweep: one simulated day of traffic per worker count
+
+Run ``python benchmarks/simulation_day.py --rate 20000 --workers 4 6 8``.
+Replays the same seeded Poisson arrivals against each worker count on a
+virtual clock and prints latency, utilization and peak queue depth, plus
+the wall time each replay took.
+"""
+import argparse
+import logging
+
+from agent_a.simulation import Simulation, parse_distribution
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=20_000, help="Arrivals per hour")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 6, 8])
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--duration", default="lognormal:0.5:1.0")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # timed-out tasks are counted, not logged
+
+    print(f"{'workers':>7} {'tasks':>9} {'timeouts':>8} {'p50':>8} {'p99':>8} "
+          f"{'util':>6} {'peak q':>7} {'wall s':>7} {'speedup':>8}")
+    for workers in args.workers:
+        simulation = Simulation(max_workers=workers, task_timeout=args.timeout,
+                                duration=parse_distribution(args.duration), seed=args.seed,
+                                sample_interval=300)
+        simulation.poisson_arrivals(args.rate, args.hours)
+        report = simulation.run()
+        peak = max(queued for _, queued, _ in report.queue_depth)
+        print(f"{workers:>7} {report.submitted:>9} {report.timed_out:>8} "
+              f"{report.latency['p50']:>7.2f}s {report.latency['p99']:>7.2f}s "
+              f"{report.utilization:>6.1%} {peak:>7} {report.wall_seconds:>7.1f} "
+              f"{report.virtual_seconds / report.wall_seconds:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""IndexedPriorityQueue operations with a million pending tasks
+
+Run ``python benchmarks/task_queue.py --pending 1000000``. Fills the queue,
+then times reprioritize, cancel, peek, snapshot and draining it with get,
+next to queue.PriorityQueue put/get for reference.
+"""
+import argparse
+import queue
+import random
+import resource
+import time
+
+from agent_a.task_queue import IndexedPriorityQueue
+
+
+def timed(label: str, count: int, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = f"{count / elapsed:12.0f} ops/s" if count else ""
+    print(f"{label:>24}: {elapsed * 1000:10.1f} ms {rate}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pending", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    ids = [f"task_{i}" for i in range(args.pending)]
+    priorities = [rng.randint(0, 100) for _ in ids]
+    changed = rng.sample(ids, args.changes)
+    cancelled = rng.sample(ids, args.changes)
+
+    reference = queue.PriorityQueue()
+    timed("PriorityQueue put", args.pending,
+          lambda: [reference.put((-p, i, task_id)) for i, (task_id, p) in enumerate(zip(ids, priorities))])
+    timed("PriorityQueue get", args.pending, lambda: [reference.get_nowait() for _ in ids])
+
+    q = IndexedPriorityQueue()
+    timed("put", args.pending, lambda: [q.put(task_id, task_id, p) for task_id, p in zip(ids, priorities)])
+    timed("reprioritize", args.changes, lambda: [q.reprioritize(task_id, rng.randint(0, 100)) for task_id in changed])
+    timed("cancel", args.changes, lambda: [q.cancel(task_id) for task_id in cancelled])
+    timed("peek", 10000, lambda: [q.peek() for _ in range(10000)])
+    timed("snapshot(100)", 0, lambda: q.snapshot(100))
+    timed("snapshot (all)", 0, lambda: q.snapshot())
+    remaining = len(q)
+    timed("get (drain)", remaining, lambda: [q.get_nowait() for _ in range(remaining)])
+    print(f"{'peak RSS':>24}: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:10.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,35 @@
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Union
+
 from .interpreter_agent import OpenInterpreterAgent
 from .decision_agent import DecisionAgent
 from .modular_agent import ModularAgent
+from .core import AgentA
+from .decision_maker import TERMINAL_STATUSES, TaskStatus
+from .server import TaskWatcher
+
+Commands = Union[Iterable[str], AsyncIterable[str]]
+
+
+@dataclass
+class CommandResult:
+    """Outcome of one command from a batch"""
+    index: int                      # Position of the command in the input
+    command: str
+    task_ids: List[str] = field(default_factory=list)
+    results: List[Any] = field(default_factory=list)  # Completed step results, in plan order
+    error: Optional[str] = None     # First failure, if any step failed
+
 
 class UnifiedAgent:
-    def __init__(self):
+    def __init__(self, agent: Optional[AgentA] = None):
         self.interpreter = OpenInterpreterAgent()
         self.decision_maker = DecisionAgent()
         self.extender = ModularAgent()
+        self._agent = agent
+        self._owns_agent = agent is None
 
     def process_command(self, command):
         parsed_command = self.interpreter.parse(command)
@@ -14,3 +37,155 @@ class UnifiedAgent:
 
     def add_extension(self, plugin):
         self.extender.extend(plugin)
+
+    @property
+    def agent(self) -> AgentA:
+        """AgentA pipeline (modules + DecisionMaker) used for batches, started on first use"""
+        if self._agent is None:
+            agent = AgentA()
+            agent.initialize_components()
+            agent.decision_maker.start()
+            self._agent = agent
+        return self._agent
+
+    def close(self):
+        """Stop the pipeline if this agent started it"""
+        if self._agent is not None and self._owns_agent:
+            self._agent.stop()
+            self._agent = None
+
+    def process_commands(self, commands: Commands, concurrency: int = 64,
+                         ordered: bool = False) -> Iterator[CommandResult]:
+        """Run a stream of commands through the pipeline, yielding results as they finish
+
+        Blocking counterpart of ``aprocess_commands``; drives it on a private
+        event loop, so it must not be called from inside a running loop.
+        """
+        loop = asyncio.new_event_loop()
+        stream = self.aprocess_commands(commands, concurrency=concurrency, ordered=ordered)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(stream.aclose())
+            loop.close()
+
+    async def aprocess_commands(self, commands: Commands, concurrency: int = 64,
+                                ordered: bool = False) -> AsyncIterator[CommandResult]:
+        """Run a (sync or async) stream of commands with at most ``concurrency`` in flight
+
+        Commands are pulled from the input only as slots free up, so the input
+        may be unbounded. Results are yielded as soon as each command's plan
+        finishes, or in input order when ``ordered`` is set (results held back
+        for ordering count against ``concurrency``).
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        agent = self.agent
+        watcher = TaskWatcher(agent.decision_maker, asyncio.get_running_loop())
+        pending: Set[asyncio.Future] = set()
+        held: Dict[int, CommandResult] = {}
+        next_index = 0
+        exhausted = False
+        commands_iter = _iterate(commands).__aiter__()
+        index = 0
+
+        try:
+            while True:
+                # Top up the window from the input
+                while not exhausted and len(pending) + len(held) < concurrency:
+                    try:
+                        command = await commands_iter.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(self._run_command(agent, watcher, index, command)))
+                    index += 1
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                finished = sorted((future.result() for future in done), key=lambda r: r.index)
+                if not ordered:
+                    for result in finished:
+                        yield result
+                    continue
+                for result in finished:
+                    held[result.index] = result
+                while next_index in held:
+                    yield held.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            # Let dropped commands arrange for their tasks to be forgotten
+            await asyncio.gather(*pending, return_exceptions=True)
+            await commands_iter.aclose()
+            watcher.close()
+
+    async def _run_command(self, agent: AgentA, watcher: TaskWatcher,
+                           index: int, command: str) -> CommandResult:
+        result = CommandResult(index=index, command=command)
+        # Off the loop: with a journal, submission waits for the group commit
+        submission = asyncio.get_running_loop().run_in_executor(None, agent.submit_command, command)
+        try:
+            result.task_ids = await asyncio.shield(submission)
+            tasks = await asyncio.gather(*(watcher.wait(task_id) for task_id in result.task_ids))
+        except asyncio.CancelledError:
+            # The consumer stopped reading; a started submission still lands, so clean up after it
+            if not result.task_ids:
+                await asyncio.wait([submission])
+                if submission.exception() is None:
+                    result.task_ids = submission.result()
+            _forget_when_finished(agent.decision_maker, result.task_ids)
+            raise
+        except Exception as e:
+            result.error = str(e)
+            return result
+
+        for task in tasks:
+            if task.status == TaskStatus.COMPLETED:
+                result.results.append(task.result)
+            elif result.error is None:
+                result.error = str(task.error)
+        agent.decision_maker.forget(result.task_ids)
+        return result
+
+
+def _forget_when_finished(decision_maker, task_ids: List[str]) -> None:
+    """Forget ``task_ids`` once all of them have finished, without needing an event loop"""
+    remaining = set(task_ids)
+    lock = threading.Lock()
+    if not remaining:
+        return
+
+    def finished(task_id: str) -> None:
+        with lock:
+            if task_id not in remaining:
+                return
+            remaining.discard(task_id)
+            if remaining:
+                return
+        decision_maker.remove_listener(listener)
+        decision_maker.forget(task_ids)
+
+    def listener(task) -> None:
+        finished(task.id)
+
+    decision_maker.add_listener(listener)
+    # Listening first means a task finishing meanwhile is caught either here or by the listener
+    for task_id in task_ids:
+        if decision_maker.get_task_status(task_id) in TERMINAL_STATUSES + (None,):
+            finished(task_id)
+
+
+async def _iterate(commands: Commands) -> AsyncIterator[str]:
+    if hasattr(commands, "__aiter__"):
+        async for command in commands:
+            yield command
+    else:
+        for command in commands:
+            yield command
@@ -0,0 +1,524 @@
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .decision_maker import TERMINAL_STATUSES, DecisionMaker, Task, TaskStatus
+from .retrieval import BM25Index
+
+
+def _portable(value: Any) -> Any:
+    """Return value if it can cross a process boundary, else its repr"""
+    try:
+        pickle.dumps(value)
+        return value
+    except Exception:
+        return repr(value)
+
+
+def _portable_error(error: Optional[BaseException]) -> Optional[BaseException]:
+    if error is None:
+        return None
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError(repr(error))
+
+
+def _worker_main(worker_id: int, inbox, results, max_workers: int, task_timeout: int,
+                 heartbeat_interval: float, index_path: Optional[str] = None):
+    """Worker process entry point: run a local DecisionMaker fed by the coordinator
+
+    ``results`` is this worker's own pipe to the coordinator, so a worker
+    killed halfway through a message can only break its own channel.
+    """
+    # Every worker maps the same index files, so their pages are shared
+    retriever = BM25Index(index_path) if index_path else None
+    decision_maker = DecisionMaker(max_workers=max_workers, task_timeout=task_timeout,
+                                   retriever=retriever)
+    global_ids: Dict[str, str] = {}  # local task id -> global task id
+    local_ids: Dict[str, str] = {}   # global task id -> local task id
+    lock = threading.Lock()
+    send_lock = threading.Lock()  # Pipe connections are not thread-safe
+    stopping = threading.Event()
+
+    def send(*message):
+        with send_lock:
+            results.send(message)
+
+    def on_finished(task: Task):
+        with lock:
+            global_id = global_ids.get(task.id)
+        if global_id is not None:
+            send("finished", worker_id, global_id, task.status.name,
+                 _portable(task.result), _portable_error(task.error))
+
+    def heartbeat():
+        while not stopping.wait(heartbeat_interval):
+            send("heartbeat", worker_id)
+
+    decision_maker.add_listener(on_finished)
+    decision_maker.start()
+    threading.Thread(target=heartbeat, daemon=True).start()
+    send("ready", worker_id, os.getpid())
+
+    while True:
+        message = inbox.get()
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "forget":
+            with lock:
+                forgotten = [local_ids.pop(global_id) for global_id in message[1] if global_id in local_ids]
+                for local_id in forgotten:
+                    del global_ids[local_id]
+            decision_maker.forget(forgotten)
+            continue
+
+        submitted = message[1]
+        try:
+            with lock:
+                if kind == "task":
+                    _, global_id, payload, priority, dependencies = message
+                    task_callable, context = pickle.loads(payload)
+                    created = [decision_maker.add_task(
+                        task_callable,
+                        priority=priority,
+                        dependencies=[local_ids[dep] for dep in dependencies if dep in local_ids],
+                        context=context
+                    )]
+                    submitted = [global_id]
+                else:  # "plan"
+                    _, submitted, query, completed = message
+                    created = decision_maker.create_reasoning_plan(query, completed=completed)
+                for local_id, global_id in zip(created, submitted):
+                    global_ids[local_id] = global_id
+                    local_ids[global_id] = local_id
+        except Exception as e:
+            for global_id in ([submitted] if isinstance(submitted, str) else submitted):
+                send("finished", worker_id, global_id, TaskStatus.FAILED.name,
+                     None, _portable_error(e))
+
+    stopping.set()
+    decision_maker.stop()
+
+
+@dataclass
+class _Worker:
+    id: int
+    process: Any
+    inbox: Any
+    results: Any  # Receiving end of the worker's result pipe
+    last_seen: float
+    tasks: Set[str] = field(default_factory=set)  # unfinished global task ids
+    ready: threading.Event = field(default_factory=threading.Event)
+
+
+class ClusterDecisionMaker:
+    """Coordinator spreading tasks and reasoning plans over worker processes
+
+    Each worker runs its own DecisionMaker, so throughput scales past the GIL.
+    Whole reasoning plans are routed to a single worker, and tasks follow the
+    worker that owns their dependencies. Workers that die or stop sending
+    heartbeats are replaced and their unfinished work is re-dispatched.
+    Task callables and contexts must be picklable. Status reads use the same
+    ``get_task_status``/``get_task_result`` API as DecisionMaker. Tasks report
+    PENDING until their worker finishes them.
+    """
+
+    REASONING_STEPS = DecisionMaker.REASONING_STEPS
+
+    def __init__(self, num_workers: Optional[int] = None, max_workers: int = 4,
+                 task_timeout: int = 60, heartbeat_interval: float = 1.0,
+                 heartbeat_timeout: float = 10.0, start_method: Optional[str] = None,
+                 index_path: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.task_timeout = task_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.index_path = index_path  # BM25Index directory for the gather_context step
+        self.running = False
+        self.lock = threading.RLock()
+        self.active_tasks: Dict[str, Task] = {}  # global task id -> Task
+        self._mp = multiprocessing.get_context(start_method)
+        self._workers: Dict[int, _Worker] = {}  # slot -> worker
+        self._slot_of: Dict[int, int] = {}      # worker id -> slot
+        self._owner: Dict[str, int] = {}        # global task id -> slot
+        self._finished_on: Dict[str, int] = {}  # global task id -> id of the worker that finished it
+        self._payloads: Dict[str, tuple] = {}   # global task id -> (payload, priority, dependencies)
+        self._plans: Dict[str, tuple] = {}      # plan id -> (query, task ids)
+        self._plan_of: Dict[str, str] = {}      # global task id -> plan id
+        self._held: Dict[str, List[str]] = {}   # dependency id -> tasks waiting on another worker
+        self._listeners: List[Callable[[Task], None]] = []
+        self._task_counter = itertools.count(1)
+        self._plan_counter = itertools.count(1)
+        self._worker_counter = itertools.count(1)
+        self._threads: List[threading.Thread] = []
+        self._retired: List[Any] = []  # result pipes of replaced workers, closed by the collector
+
+    def _spawn_worker(self, slot: int) -> _Worker:
+        worker_id = next(self._worker_counter)
+        inbox = self._mp.Queue()
+        results, results_writer = self._mp.Pipe(duplex=False)
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(worker_id, inbox, results_writer, self.max_workers,
+                  self.task_timeout, self.heartbeat_interval, self.index_path),
+            name=f"agent-a-worker-{slot}",
+            daemon=True
+        )
+        process.start()
+        results_writer.close()  # Only the worker writes, so its exit shows up as EOF here
+        worker = _Worker(id=worker_id, process=process, inbox=inbox, results=results,
+                         last_seen=time.monotonic())
+        self._workers[slot] = worker
+        self._slot_of[worker_id] = slot
+        return worker
+
+    def start(self) -> None:
+        """Spawn the worker processes and the coordinator threads"""
+        if self.running:
+            return
+        self.running = True
+        with self.lock:
+            for slot in range(self.num_workers):
+                self._spawn_worker(slot)
+        self._threads = [
+            threading.Thread(target=self._collect, daemon=True),
+            threading.Thread(target=self._monitor, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        self.logger.info("ClusterDecisionMaker started with %d workers", self.num_workers)
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop all workers and fail any unfinished tasks
+
+        With ``wait=False`` workers are terminated instead of being asked to
+        finish their running tasks first. Results workers send while they
+        shut down are still collected; only tasks left without one fail.
+        """
+        with self.lock:
+            self.running = False  # The monitor stops replacing workers
+            workers = list(self._workers.values())
+        for worker in workers:
+            if not wait:
+                worker.process.terminate()
+                continue
+            try:
+                worker.inbox.put(("stop",))
+            except Exception:
+                pass
+        for worker in workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        # The collector exits once every worker's pipe has reached EOF
+        for thread in self._threads:
+            thread.join(timeout=5)
+        with self.lock:
+            self._workers.clear()
+        for channel in [worker.results for worker in workers] + self._retired:
+            channel.close()
+        self._retired = []
+
+        with self.lock:
+            unfinished = [t for t in self.active_tasks.values() if t.status not in TERMINAL_STATUSES]
+        for task in unfinished:
+            task.status = TaskStatus.FAILED
+            task.error = InterruptedError("ClusterDecisionMaker stopped")
+            self._notify(task)
+        self.logger.info("ClusterDecisionMaker stopped")
+
+    def _new_task(self, task_callable: Optional[Callable], priority: int,
+                  dependencies: Optional[List[str]], context: Optional[Dict[str, Any]]) -> Task:
+        task = Task(
+            id=f"task_{next(self._task_counter)}",
+            callable=task_callable,
+            status=TaskStatus.PENDING,
+            dependencies=dependencies or [],
+            priority=priority,
+            context=context or {}
+        )
+        self.active_tasks[task.id] = task
+        return task
+
+    def add_task(self, task_callable: Callable, priority: int = 0,
+                 dependencies: List[str] = None, context: Dict[str, Any] = None) -> str:
+        """Add a task; it runs on the worker that owns its dependencies"""
+        if not callable(task_callable):
+            raise ValueError("Task must be callable")
+        try:
+            payload = pickle.dumps((task_callable, context or {}))
+        except Exception as e:
+            raise ValueError(f"Task and context must be picklable in cluster mode: {e}")
+
+        with self.lock:
+            task = self._new_task(task_callable, priority, dependencies, context)
+            self._payloads[task.id] = (payload, priority, task.dependencies)
+            self._dispatch_task(task.id)
+        return task.id
+
+    def create_reasoning_plan(self, query: str) -> List[str]:
+        """Create a reasoning plan whose steps all run on one worker"""
+        with self.lock:
+            plan_id = f"plan_{next(self._plan_counter)}"
+            task_ids = []
+            for step in self.REASONING_STEPS:
+                dependencies = [task_ids[-1]] if task_ids else None
+                task = self._new_task(None, step['priority'], dependencies, {'query': query})
+                task_ids.append(task.id)
+                self._plan_of[task.id] = plan_id
+            self._plans[plan_id] = (query, task_ids)
+            self._dispatch_plan(plan_id)
+        return list(task_ids)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until every worker process has booted"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            workers = list(self._workers.values())
+        for worker in workers:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not worker.ready.wait(remaining):
+                return False
+        return True
+
+    def get_task_status(self, task_id: str) -> Optional[TaskStatus]:
+        """Get the current status of a task"""
+        task = self.active_tasks.get(task_id)
+        return task.status if task else None
+
+    def get_task_result(self, task_id: str) -> Optional[Any]:
+        """Get the result of a completed task"""
+        task = self.active_tasks.get(task_id)
+        if task and task.status == TaskStatus.COMPLETED:
+            return task.result
+        return None
+
+    def forget(self, task_ids: Iterable[str]) -> None:
+        """Drop finished tasks (and plans) the caller has collected results for
+
+        The workers that ran them are told to drop their copies too.
+        """
+        with self.lock:
+            by_worker: Dict[int, List[str]] = {}
+            for task_id in task_ids:
+                task = self.active_tasks.get(task_id)
+                if task is None or task.status not in TERMINAL_STATUSES:
+                    continue
+                del self.active_tasks[task_id]
+                self._payloads.pop(task_id, None)
+                worker_id = self._finished_on.pop(task_id, None)
+                if worker_id is not None:
+                    by_worker.setdefault(worker_id, []).append(task_id)
+                plan_id = self._plan_of.pop(task_id, None)
+                if plan_id is not None and not any(
+                        step_id in self.active_tasks for step_id in self._plans[plan_id][1]):
+                    del self._plans[plan_id]
+            for worker_id, forgotten in by_worker.items():
+                worker = self._workers.get(self._slot_of.get(worker_id))
+                if worker is not None and worker.id == worker_id:  # A replaced worker took its copies with it
+                    worker.inbox.put(("forget", forgotten))
+
+    def worker_status(self) -> List[Dict[str, Any]]:
+        """Health and load of each worker slot"""
+        now = time.monotonic()
+        with self.lock:
+            return [
+                {
+                    'slot': slot,
+                    'worker_id': worker.id,
+                    'pid': worker.process.pid,
+                    'alive': worker.process.is_alive(),
+                    'last_heartbeat_age': now - worker.last_seen,
+                    'pending_tasks': len(worker.tasks),
+                }
+                for slot, worker in sorted(self._workers.items())
+            ]
+
+    def add_listener(self, listener: Callable[[Task], None]) -> None:
+        """Register a callback invoked whenever a task completes or fails"""
+        with self.lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Task], None]) -> None:
+        """Remove a previously registered task listener"""
+        with self.lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, task: Task) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(task)
+            except Exception as e:
+                self.logger.error("Task listener error: %s", e)
+
+    def _least_loaded_slot(self) -> int:
+        return min(self._workers, key=lambda slot: len(self._workers[slot].tasks))
+
+    def _assign(self, slot: int, task_ids: List[str]) -> _Worker:
+        worker = self._workers[slot]
+        for task_id in task_ids:
+            self._owner[task_id] = slot
+            worker.tasks.add(task_id)
+        return worker
+
+    def _dispatch_plan(self, plan_id: str) -> None:
+        """Send a whole plan, minus its completed steps, to one worker (lock held)"""
+        query, task_ids = self._plans[plan_id]
+        tasks = [self.active_tasks[task_id] for task_id in task_ids]
+        if any(task.status == TaskStatus.FAILED for task in tasks):
+            for task in tasks:
+                if task.status not in TERMINAL_STATUSES:
+                    self._fail(task, RuntimeError(f"Plan {plan_id} has a failed step"))
+            return
+
+        completed = {
+            step['name']: task.result
+            for step, task in zip(self.REASONING_STEPS, tasks)
+            if task.status == TaskStatus.COMPLETED
+        }
+        pending = [task.id for task in tasks if task.status not in TERMINAL_STATUSES]
+        if not pending or not self._workers:
+            return
+        worker = self._assign(self._least_loaded_slot(), pending)
+        worker.inbox.put(("plan", task_ids, query, completed))
+
+    def _dispatch_task(self, task_id: str) -> None:
+        """Route a single task next to its dependencies (lock held)"""
+        task = self.active_tasks[task_id]
+        payload, priority, dependencies = self._payloads[task_id]
+
+        waiting_on = []
+        for dep_id in dependencies:
+            dep = self.active_tasks.get(dep_id)
+            if dep is not None and dep.status == TaskStatus.FAILED:
+                self._fail(task, RuntimeError(f"Dependency {dep_id} failed"))
+                return
+            if dep is None or dep.status != TaskStatus.COMPLETED:
+                waiting_on.append(dep_id)
+
+        if not self._workers:
+            return
+        owners = [self._owner[dep_id] for dep_id in waiting_on if dep_id in self._owner]
+        slot = owners[0] if owners else self._least_loaded_slot()
+
+        # Dependencies on other workers are awaited here, not on the worker
+        remote = [dep_id for dep_id in waiting_on if self._owner.get(dep_id) != slot]
+        if remote:
+            self._held.setdefault(remote[0], []).append(task_id)
+            return
+
+        worker = self._assign(slot, [task_id])
+        worker.inbox.put(("task", task_id, payload, priority, waiting_on))
+
+    def _fail(self, task: Task, error: Exception) -> None:
+        """Fail a task that never reached a worker (lock held)"""
+        task.status = TaskStatus.FAILED
+        task.error = error
+        self._release_held(task)
+        self._notify(task)
+
+    def _release_held(self, task: Task) -> None:
+        for held_id in self._held.pop(task.id, []):
+            self._dispatch_task(held_id)
+
+    def _collect(self) -> None:
+        """Apply worker messages to the aggregated task table"""
+        broken = set()  # channels of workers that died, awaiting replacement
+        while True:
+            with self.lock:
+                for channel in self._retired:
+                    broken.discard(channel)
+                    channel.close()
+                self._retired = []
+                channels = {worker.results: worker for worker in self._workers.values()
+                            if worker.results not in broken}
+                if not self.running and not channels:
+                    return  # Stopping, and every worker has exited with its results read
+            for channel in multiprocessing.connection.wait(list(channels), timeout=0.2):
+                try:
+                    message = channel.recv()
+                except Exception:
+                    # EOF or a message cut short by a killed worker; the monitor replaces it
+                    broken.add(channel)
+                    continue
+                self._apply(channels[channel], message)
+
+    def _apply(self, worker: _Worker, message: tuple) -> None:
+        kind = message[0]
+        with self.lock:
+            slot = self._slot_of.get(worker.id)
+            if self._workers.get(slot) is not worker:
+                return  # Message from a replaced worker
+            worker.last_seen = time.monotonic()
+            if kind == "ready":
+                worker.ready.set()
+            elif kind == "finished":
+                self._on_finished(slot, worker, *message[2:])
+
+    def _on_finished(self, slot: int, worker: _Worker, task_id: str, status: str,
+                     result: Any, error: Optional[BaseException]) -> None:
+        task = self.active_tasks.get(task_id)
+        if task is None or self._owner.get(task_id) != slot or task.status in TERMINAL_STATUSES:
+            return
+        worker.tasks.discard(task_id)
+        del self._owner[task_id]
+        self._finished_on[task_id] = worker.id
+        task.status = TaskStatus[status]
+        task.result = result
+        task.error = error
+        self._release_held(task)
+        self._notify(task)
+
+    def _monitor(self) -> None:
+        """Replace dead or silent workers and re-dispatch their work"""
+        while self.running:
+            time.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            with self.lock:
+                if not self.running:
+                    break
+                for slot, worker in list(self._workers.items()):
+                    silent = now - worker.last_seen > self.heartbeat_timeout
+                    if worker.process.is_alive() and not silent:
+                        continue
+                    self.logger.warning(
+                        "Worker %d (pid %s) %s, re-dispatching %d task(s)", worker.id,
+                        worker.process.pid, "unresponsive" if silent else "died", len(worker.tasks)
+                    )
+                    if worker.process.is_alive():
+                        worker.process.terminate()
+                    self._retired.append(worker.results)
+                    self._spawn_worker(slot)
+                    self._redispatch(worker)
+
+    def _redispatch(self, worker: _Worker) -> None:
+        """Hand a lost worker's unfinished tasks to the live workers (lock held)"""
+        orphaned = sorted(worker.tasks, key=lambda task_id: int(task_id.split('_')[1]))
+        worker.tasks.clear()
+        for task_id in orphaned:
+            self._owner.pop(task_id, None)
+
+        # Submission order keeps dependency chains together on one worker
+        plans_sent = set()
+        for task_id in orphaned:
+            if self.active_tasks[task_id].status in TERMINAL_STATUSES:
+                continue
+            plan_id = self._plan_of.get(task_id)
+            if plan_id is None:
+                self._dispatch_task(task_id)
+            elif plan_id not in plans_sent:
+                plans_sent.add(plan_id)
+                self._dispatch_plan(plan_id)
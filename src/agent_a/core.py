@@ -1,37 +1,70 @@
+import asyncio
 import logging
 import signal
 import sys
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from agent_a.open_interpreter.interpreter import InteractiveInterpreter
-from agent_a.agent_zero.decision_maker import DecisionMaker
-from agent_a.agent_k.modularity import Modularity, Module
+from agent_a.agent_zero.decision_maker import TERMINAL_STATUSES, DecisionMaker, Task, TaskStatus
+from agent_a.agent_k.modularity import Modularity, Module, ModuleContext
+from agent_a.server import AgentServer
+from agent_a.cluster import ClusterDecisionMaker
+from agent_a.journal import TaskJournal
+from agent_a.retrieval import BM25Index
+from agent_a.logging_setup import configure_logging
+from agent_a.lifecycle import InFlight, Lifecycle, LifecycleTimings, start_parallel
 
 class AgentA:
-    def __init__(self):
-        self._setup_logging()
+    def __init__(self, cluster_workers: int = 0, journal_path: Optional[str] = None,
+                 log_mode: str = "debug", index_path: Optional[str] = None,
+                 drain_timeout: float = 30.0):
+        if cluster_workers and journal_path:
+            # Workers run their own DecisionMakers; the coordinator has nothing to journal
+            raise ValueError("A task journal is not supported in cluster mode (cluster_workers > 0)")
+        self._setup_logging(log_mode)
+        self.cluster_workers = cluster_workers  # > 0 runs DecisionMaker across processes
+        self.journal_path = journal_path  # Write-ahead task journal, replayed on start
+        self.index_path = index_path  # BM25Index directory searched by gather_context
+        self.drain_timeout = drain_timeout  # Seconds run() gives in-flight plans when stopping
         self.running = False
+        self.draining = False
+        self.lifecycle = Lifecycle()
+        self.in_flight: Optional[InFlight] = None  # Plans a drain waits for
+        self._in_run = False
+        self._result_lists: Dict[str, List[Any]] = {}  # task id -> results list of its command
+        self._result_lock = threading.Lock()
         self.interpreter: Optional[InteractiveInterpreter] = None
         self.decision_maker: Optional[DecisionMaker] = None
         self.modularity: Optional[Modularity] = None
+        self.server: Optional[AgentServer] = None
         
-        # Setup signal handlers
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        # Setup signal handlers (only possible from the main thread)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self._signal_handler)
+            signal.signal(signal.SIGTERM, self._signal_handler)
 
-    def _setup_logging(self):
-        """Setup logging configuration"""
+    def _setup_logging(self, mode: str = "debug"):
+        """Setup logging configuration
+
+        ``mode`` is a logging_setup preset: "debug" (synchronous), "async"
+        (background writer thread) or "production" (async, INFO, JSON, rate limited).
+        "debug" only configures this module's logger, as before, so the other
+        modules' per-task DEBUG lines stay off; the other presets cover the package.
+        """
+        package = __name__.rpartition('.')[0] or __name__
+        configure_logging(mode, logger_name=__name__ if mode == "debug" else package)
         self.logger = logging.getLogger(__name__)
-        self.logger.handlers.clear()
-        self.logger.setLevel(logging.DEBUG)
-        
-        handler = logging.StreamHandler()
-        handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+
+    def _build_modularity(self) -> Modularity:
+        self.modularity = Modularity()
+        self._register_core_modules()
+        return self.modularity
+
+    def _build_decision_maker(self, components: Dict[str, Any]):
+        if self.cluster_workers:
+            return ClusterDecisionMaker(num_workers=self.cluster_workers, index_path=self.index_path)
+        return DecisionMaker(journal=components["journal"], retriever=components["retriever"])
 
     def _register_core_modules(self):
         """Register core functionality modules"""
@@ -56,77 +89,179 @@ class AgentA:
         if command:
             # Create reasoning plan
             task_ids = self.decision_maker.create_reasoning_plan(command)
-            context["task_ids"] = task_ids
+            context.set("task_ids", task_ids)
 
     def _handle_result_module(self, context: Dict[str, Any]):
-        """Core module for handling results"""
-        task_ids = context.get("task_ids", [])
+        """Core module for handling results
+
+        ``results`` is filled in as the plan's tasks complete (see
+        ``_collect_result``), since they are still queued when this runs.
+        """
+        task_ids = context.get("task_ids") or []
         results = []
-        
-        for task_id in task_ids:
-            result = self.decision_maker.get_task_result(task_id)
-            if result:
-                results.append(result)
-                
-        context["results"] = results
-
-    def _command_handler(self, command: str):
-        """Handle commands from the interpreter"""
-        self.modularity.context.set("current_command", command)
-        self.modularity.extend()
+
+        # Under the lock, a task either finished already or its listener call is still to come
+        with self._result_lock:
+            for task_id in task_ids:
+                status = self.decision_maker.get_task_status(task_id)
+                if status == TaskStatus.COMPLETED:
+                    results.append(self.decision_maker.get_task_result(task_id))
+                elif status is not None and status not in TERMINAL_STATUSES:
+                    self._result_lists[task_id] = results
+
+        context.set("results", results)
+
+    def _collect_result(self, task: Task):
+        """DecisionMaker listener: add a finished task's result to its command's results"""
+        with self._result_lock:
+            results = self._result_lists.pop(task.id, None)
+            if results is not None and task.status == TaskStatus.COMPLETED:
+                results.append(task.result)
+
+    def _command_handler(self, command: str) -> ModuleContext:
+        """Handle commands from the interpreter in a request-scoped context"""
+        if self.draining:
+            raise RuntimeError("AgentA is draining and no longer accepts commands")
+        context = self.modularity.context.scope({"current_command": command})
+        self.modularity.extend(context)
+        if self.in_flight is not None:
+            self.in_flight.add(context.get("task_ids") or [])
+        return context
+
+    def submit_command(self, command: str) -> List[str]:
+        """Run a command through the module pipeline and return its task IDs"""
+        context = self._command_handler(command)
+        return list(context.get("task_ids") or [])
 
     def initialize_components(self):
-        """Initialize all components with proper error handling"""
+        """Initialize all components with proper error handling
+
+        Independent components are built concurrently: opening the journal
+        and the retrieval index overlap with each other and with the
+        interpreter and module setup, and the DecisionMaker (which replays
+        the journal) starts as soon as both are open.
+        """
+        self.lifecycle.begin()
+        local = not self.cluster_workers  # Cluster workers open their own index; no journal (see __init__)
+        steps = {
+            "interpreter": (lambda _: InteractiveInterpreter(self), ()),
+            "modularity": (lambda _: self._build_modularity(), ()),
+            "journal": (lambda _: TaskJournal(self.journal_path) if local and self.journal_path else None, ()),
+            "retriever": (lambda _: BM25Index(self.index_path) if local and self.index_path else None, ()),
+            "decision_maker": (self._build_decision_maker, ("journal", "retriever")),
+        }
         try:
-            self.interpreter = InteractiveInterpreter(self)
-            self.decision_maker = DecisionMaker()
-            self.modularity = Modularity()
-            self._register_core_modules()
+            components = start_parallel(steps, self.lifecycle.timings.components)
         except Exception as e:
             self.logger.error(f"Error initializing components: {e}")
             raise
+        self.interpreter = components["interpreter"]
+        self.modularity = components["modularity"]
+        self.decision_maker = components["decision_maker"]
+        self.decision_maker.add_listener(self._collect_result)
+        self.lifecycle.mark_started()
 
-    def run(self):
-        """Main execution loop"""
-        try:
-            self.logger.info("Starting Agent-A")
-            self.initialize_components()
-            
-            if not all([self.interpreter, self.decision_maker, self.modularity]):
-                raise RuntimeError("Components not properly initialized")
-
-            # Start decision maker in background
-            self.decision_maker.start()
-            
-            # Register interpreter commands as decision maker tasks
+    def start(self, interactive: bool = False) -> LifecycleTimings:
+        """Build and start every component, returning once the agent is ready
+
+        With ``interactive`` the interpreter reads commands from stdin, and
+        its ``exit`` requests a stop.
+        """
+        self.initialize_components()
+        self.draining = False
+        # Plans resumed from the journal are in flight too
+        self.in_flight = InFlight(self.decision_maker)
+        self.in_flight.add(list(self.decision_maker.active_tasks))
+        self.decision_maker.start()
+        if self.cluster_workers and not self.decision_maker.wait_ready(timeout=self.drain_timeout):
+            self.logger.warning("Cluster workers not ready after %.0f s", self.drain_timeout)
+
+        if interactive:
             self.interpreter.set_command_handler(self._command_handler)
-            
-            # Start interpreter (non-blocking)
+            self.interpreter.set_stop_handler(self.lifecycle.request_stop)
             self.interpreter.start_async()
-            
-            # Main loop
-            self.running = True
-            while self.running:
-                time.sleep(0.1)  # Prevent CPU spinning
-                
+        self.running = True
+        self.lifecycle.mark_ready()
+        return self.lifecycle.timings
+
+    def run(self):
+        """Run interactively until ``exit``, end of input or a signal, then drain and stop"""
+        self.logger.info("Starting Agent-A")
+        self._in_run = True
+        try:
+            self.start(interactive=True)
+            # Blocks without polling; signal handlers still run while waiting
+            self.lifecycle.stop_requested.wait()
+            self.drain(self.drain_timeout)
         except Exception as e:
             self.logger.error(f"Critical error during execution: {e}")
-            self.cleanup()
             raise
         finally:
-            self.cleanup()
+            self._in_run = False
+            self.stop()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Stop taking commands, give in-flight plans ``timeout`` seconds to finish, then stop
+
+        Returns True if everything in flight finished. Otherwise the rest is
+        abandoned without waiting for running tasks (with a journal, their
+        plans resume on the next start).
+        """
+        started = time.monotonic()
+        self.draining = True
+        if self.interpreter:
+            self.interpreter.stop()
+        in_flight = self.in_flight
+        finished = in_flight is None or in_flight.wait_idle(timeout)
+        timings = self.lifecycle.timings
+        timings.drain = time.monotonic() - started
+        if not finished:
+            timings.abandoned = len(in_flight)
+            self.logger.warning("Drain deadline passed with %d tasks in flight", timings.abandoned)
+        self.stop(wait=finished)
+        return finished
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765,
+              path: Optional[str] = None, **server_options):
+        """Run headless, serving commands over local TCP or a Unix socket"""
+        try:
+            self.logger.info("Starting Agent-A server")
+            self.start()
+            self.server = AgentServer(self, host=host, port=port, path=path, **server_options)
+            self.running = True
+            asyncio.run(self.server.serve_forever())
+        finally:
+            self.running = False
+            self.server = None
+            self.stop()
 
-    def stop(self):
-        """Stop all components"""
+    def stop(self, wait: bool = True):
+        """Stop all components; ``wait=False`` does not wait for running tasks"""
+        if self.lifecycle.stopped.is_set():
+            return
+        started = time.monotonic()
+        self.running = False
+        self.draining = True
         if self.interpreter:
             self.interpreter.stop()
+        if self.in_flight is not None:
+            self.in_flight.close()
         if self.decision_maker:
-            self.decision_maker.stop()
+            self.decision_maker.stop(wait=wait)
         if self.modularity:
             self.modularity.cleanup()
+        self.lifecycle.mark_stopped(time.monotonic() - started)
 
     def _signal_handler(self, signum, frame):
         """Handle system signals for graceful shutdown"""
         self.logger.info(f"Received signal {signum}, stopping AgentA...")
+        if self.server is not None:
+            # Headless mode: let in-flight requests finish, serve() stops the rest
+            self.server.request_drain()
+            return
+        if self._in_run:
+            # run() is waiting for this; it drains and stops
+            self.lifecycle.request_stop()
+            return
         self.stop()
         sys.exit(0)
@@ -1,12 +1,17 @@
+import gc
 import threading
 import time
 import queue
-from typing import Callable, List, Dict, Any, Optional
+from typing import Callable, Iterable, List, Dict, Any, Optional
 import logging
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from concurrent.futures import CancelledError, Executor, ThreadPoolExecutor, TimeoutError
 import networkx as nx
 from dataclasses import dataclass
 from enum import Enum, auto
+from .journal import JournalState, TaskJournal, callable_ref, resolve_callable
+from .query_analysis import QueryBatcher, analyze_query
+from .retrieval import BM25Index
+from .task_queue import IndexedPriorityQueue
 
 class TaskStatus(Enum):
     PENDING = auto()
@@ -14,6 +19,8 @@ class TaskStatus(Enum):
     COMPLETED = auto()
     FAILED = auto()
 
+TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
 @dataclass
 class Task:
     id: str
@@ -24,10 +31,23 @@ class Task:
     dependencies: List[str] = None
     priority: int = 0
     context: Dict[str, Any] = None
+    scope: Optional["DecisionContext"] = None
+    name: Optional[str] = None  # Reasoning step name for plan tasks
+    plan_id: Optional[str] = None
+
+_MISSING = object()
 
 class DecisionContext:
-    def __init__(self):
-        self._data = {}
+    """Key/value context, optionally layered over a parent context
+
+    Reads are lock-free (single dict lookups are atomic); writes only ever
+    touch this layer, so request scopes never clobber the shared parent.
+    """
+
+    def __init__(self, parent: Optional["DecisionContext"] = None,
+                 data: Optional[Dict[str, Any]] = None):
+        self._data = dict(data or {})
+        self._parent = parent
         self._lock = threading.Lock()
 
     def set(self, key: str, value: Any):
@@ -35,26 +55,85 @@ class DecisionContext:
             self._data[key] = value
 
     def get(self, key: str, default=None) -> Any:
-        with self._lock:
-            return self._data.get(key, default)
+        value = self._data.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self._parent is not None:
+            return self._parent.get(key, default)
+        return default
 
     def update(self, data: Dict[str, Any]):
         with self._lock:
             self._data.update(data)
 
+    def scope(self, data: Optional[Dict[str, Any]] = None) -> "DecisionContext":
+        """Create a child context whose writes stay local to it"""
+        return DecisionContext(parent=self, data=data)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Flatten this context and its parents into a plain dict"""
+        merged = self._parent.snapshot() if self._parent is not None else {}
+        merged.update(self._data.copy())
+        return merged
+
 class DecisionMaker:
-    def __init__(self, max_workers: int = 4, task_timeout: int = 60):
+    # Steps of a reasoning plan, run in order; each calls the ``_<name>`` method
+    REASONING_STEPS = [
+        {'name': 'analyze_query', 'priority': 100},
+        {'name': 'gather_context', 'priority': 90},
+        {'name': 'generate_solution', 'priority': 80},
+        {'name': 'validate_solution', 'priority': 70},
+    ]
+
+    QUERY_BATCH_SIZE = 512
+
+    def __init__(self, max_workers: int = 4, task_timeout: int = 60,
+                 journal: Optional[TaskJournal] = None,
+                 query_batch_window: Optional[float] = 0.002,
+                 retriever: Optional[BM25Index] = None, retrieval_k: int = 5,
+                 clock: Callable[[], float] = time.monotonic, executor: Optional[Executor] = None):
         self.logger = logging.getLogger(__name__)
-        self.task_queue = queue.PriorityQueue()
+        self.task_queue = IndexedPriorityQueue()  # keyed by task id, highest priority first
         self.running = False
         self.reasoning_graph = nx.DiGraph()
         self.lock = threading.Lock()
         self.max_workers = max_workers
         self.task_timeout = task_timeout
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.clock = clock  # Deadlines are measured on this clock (virtual in simulations)
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers)
         self.active_tasks = {}  # task_id -> Task
         self.context = DecisionContext()
+        self._slots = threading.Semaphore(max_workers)
+        self._running: Dict[str, tuple] = {}  # task_id -> (deadline, future, task)
+        self._waiting: Dict[str, List[Task]] = {}  # dependency id -> parked tasks
         self._task_counter = 0
+        self._listeners: List[Callable[[Task], None]] = []
+        self._plans: Dict[str, tuple] = {}  # plan id -> (query, task ids)
+
+        # gather_context pulls the top ``retrieval_k`` snippets from a local index
+        self.retriever = retriever
+        self.retrieval_k = retrieval_k
+
+        # analyze_query steps from concurrent plans are analyzed together, off the worker pool
+        self.query_batcher: Optional[QueryBatcher] = None
+        if query_batch_window:
+            self.query_batcher = QueryBatcher(max_batch=self.QUERY_BATCH_SIZE,
+                                              window=query_batch_window)
+
+        # Optional write-ahead journal: replay what a previous process left behind
+        self.journal = journal
+        self._replaying = False
+        if journal is not None:
+            # Replay allocates millions of short-lived objects; pause the cyclic GC meanwhile
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                self._recover(journal.replay())
+            finally:
+                if gc_enabled:
+                    gc.enable()
+            journal.set_snapshot(self._journal_snapshot)
+            journal.compact()
 
     def _get_next_task_id(self) -> str:
         with self.lock:
@@ -62,8 +141,13 @@ class DecisionMaker:
             return f"task_{self._task_counter}"
 
     def add_task(self, task_callable: Callable, priority: int = 0, 
-                 dependencies: List[str] = None, context: Dict[str, Any] = None) -> str:
-        """Add a task with priority and dependencies"""
+                 dependencies: List[str] = None, context: Dict[str, Any] = None,
+                 scope: Optional[DecisionContext] = None) -> str:
+        """Add a task with priority and dependencies
+
+        Tasks sharing a ``scope`` see each other's dict results; without one,
+        results are merged into the global context.
+        """
         if not callable(task_callable):
             raise ValueError("Task must be callable")
 
@@ -74,97 +158,282 @@ class DecisionMaker:
             status=TaskStatus.PENDING,
             dependencies=dependencies or [],
             priority=priority,
-            context=context or {}
+            context=context or {},
+            scope=scope
         )
 
         try:
-            self.task_queue.put((-priority, task))  # Negative priority for highest-first
-            with self.lock:
-                self.active_tasks[task_id] = task
+            seq = self._journal(self._submit_record(task))
+            self._enqueue(task)
+            self._wait_durable(seq)
             return task_id
         except Exception as e:
-            self.logger.error(f"Error adding task: {e}")
+            self.logger.error("Error adding task: %s", e)
             raise
 
+    def _enqueue(self, task: Task) -> None:
+        """Register a task and queue it for dispatch"""
+        with self.lock:
+            self.active_tasks[task.id] = task
+        self.task_queue.put(task.id, task, task.priority)
+
     def get_task_status(self, task_id: str) -> Optional[TaskStatus]:
         """Get the current status of a task"""
-        with self.lock:
-            task = self.active_tasks.get(task_id)
-            return task.status if task else None
+        task = self.active_tasks.get(task_id)
+        return task.status if task else None
 
     def get_task_result(self, task_id: str) -> Optional[Any]:
         """Get the result of a completed task"""
-        with self.lock:
-            task = self.active_tasks.get(task_id)
-            if task and task.status == TaskStatus.COMPLETED:
-                return task.result
+        task = self.active_tasks.get(task_id)
+        if task and task.status == TaskStatus.COMPLETED:
+            return task.result
+        return None
+
+    def cancel_task(self, task_id: str) -> bool:
+        """Fail a task that has not started yet; its dependents fail with it
+
+        Returns False if the task is unknown, already running or finished.
+        """
+        task = self.task_queue.cancel(task_id)
+        if task is None:
+            task = self._unpark(task_id)
+        if task is None:
+            return False
+        task.status = TaskStatus.FAILED
+        task.error = CancelledError(f"Task {task_id} cancelled")
+        self._finish_task(task)
+        return True
+
+    def _unpark(self, task_id: str) -> Optional[Task]:
+        """Remove a task from the dependency wait lists, if it is parked there"""
+        task = self.active_tasks.get(task_id)
+        if task is None:
             return None
+        with self.lock:
+            for dep_id in task.dependencies or ():
+                parked = self._waiting.get(dep_id, ())
+                for index, waiting in enumerate(parked):
+                    if waiting is task:
+                        del parked[index]
+                        if not parked:
+                            del self._waiting[dep_id]
+                        return task
+        return None
+
+    def reprioritize_task(self, task_id: str, priority: int) -> bool:
+        """Change the priority of a task that has not started yet
+
+        Queued tasks move in the queue; parked tasks use the new priority once
+        their dependencies finish. The change is not journaled.
+        """
+        task = self.active_tasks.get(task_id)
+        if task is None or task.status != TaskStatus.PENDING:
+            return False
+        task.priority = priority
+        self.task_queue.reprioritize(task_id, priority)
+        return True
+
+    def get_pending_tasks(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Queued tasks in dispatch order (the first ``limit`` if given), for monitoring"""
+        return [
+            {'id': task_id, 'priority': priority, 'name': task.name, 'plan_id': task.plan_id}
+            for task_id, priority, task in self.task_queue.snapshot(limit)
+        ]
 
-    def _can_execute_task(self, task: Task) -> bool:
-        """Check if all dependencies are completed"""
-        if not task.dependencies:
-            return True
+    def forget(self, task_ids: Iterable[str]) -> None:
+        """Drop finished tasks (and plans) the caller has collected results for
 
+        Long-running batch callers use this to keep ``active_tasks`` bounded;
+        tasks that have not reached a terminal state are kept.
+        """
         with self.lock:
-            return all(
-                self.active_tasks.get(dep_id) is not None and
-                self.active_tasks[dep_id].status == TaskStatus.COMPLETED
-                for dep_id in task.dependencies
-            )
+            for task_id in task_ids:
+                task = self.active_tasks.get(task_id)
+                if task is not None and task.status in TERMINAL_STATUSES:
+                    del self.active_tasks[task_id]
+                    self._plans.pop(task_id, None)
+
+    def add_listener(self, listener: Callable[[Task], None]) -> None:
+        """Register a callback invoked whenever a task completes or fails"""
+        with self.lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Task], None]) -> None:
+        """Remove a previously registered task listener"""
+        with self.lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, task: Task) -> None:
+        """Tell listeners that a task reached a terminal state"""
+        for listener in list(self._listeners):
+            try:
+                listener(task)
+            except Exception as e:
+                self.logger.error("Task listener error: %s", e)
+
+    def _park_if_blocked(self, task: Task) -> bool:
+        """Park a task until its dependencies finish; returns True if it cannot run now"""
+        failed_dep = None
+        with self.lock:
+            for dep_id in task.dependencies or ():
+                dep = self.active_tasks.get(dep_id)
+                if dep is not None and dep.status == TaskStatus.COMPLETED:
+                    continue
+                if dep is not None and dep.status == TaskStatus.FAILED:
+                    failed_dep = dep_id
+                    break
+                self._waiting.setdefault(dep_id, []).append(task)
+                return True
+
+        if failed_dep is None:
+            return False
+        task.status = TaskStatus.FAILED
+        task.error = RuntimeError(f"Dependency {failed_dep} failed")
+        self._finish_task(task)
+        return True
+
+    def _expire_timed_out(self) -> float:
+        """Fail tasks past their deadline; returns seconds until the next one"""
+        now = self.clock()
+        next_wait = 1.0
+        expired = []
+        with self.lock:
+            # Every deadline is dispatch time + task_timeout, so insertion order is deadline order
+            for deadline, future, task in self._running.values():
+                if deadline > now:
+                    next_wait = min(next_wait, deadline - now)
+                    break
+                expired.append((deadline, future, task))
+            for _, _, task in expired:
+                del self._running[task.id]
+
+        for _, future, task in expired:
+            self.logger.error("Task %s timed out", task.id)
+            task.status = TaskStatus.FAILED
+            task.error = TimeoutError(f"Task timed out after {self.task_timeout} seconds")
+            future.cancel()
+            self._finish_task(task)
+        return next_wait
 
     def execute_tasks(self) -> None:
-        """Main task execution loop"""
+        """Main task dispatch loop
+
+        Tasks are handed to the executor without waiting for them, so up to
+        ``max_workers`` tasks (from any number of plans) run concurrently.
+        """
         self.running = True
         while self.running:
             try:
-                _, task = self.task_queue.get(timeout=1)
-                
-                if not self._can_execute_task(task):
-                    # Put back in queue with slightly lower priority
-                    self.task_queue.put((-task.priority + 1, task))
+                wait = self._expire_timed_out()
+                if not self._slots.acquire(timeout=wait):
+                    continue
+                try:
+                    task = self.task_queue.get(timeout=wait)
+                except queue.Empty:
+                    self._slots.release()
                     continue
 
-                self._safe_execute_task(task)
-            except queue.Empty:
-                continue
+                self._dispatch(task)
             except Exception as e:
-                self.logger.error(f"Task execution error: {e}")
+                self.logger.error("Task execution error: %s", e)
+
+    def dispatch_ready(self) -> int:
+        """Expire overdue tasks and dispatch queued ones while slots are free, without blocking
+
+        For callers that drive the DecisionMaker themselves instead of
+        ``start()``, such as the simulator. Returns the number of tasks taken
+        off the queue.
+        """
+        self._expire_timed_out()
+        handled = 0
+        while self._slots.acquire(blocking=False):
+            try:
+                task = self.task_queue.get_nowait()
+            except queue.Empty:
+                self._slots.release()
+                break
+            self._dispatch(task)
+            handled += 1
+        return handled
+
+    def _dispatch(self, task: Task) -> None:
+        """Run a dequeued task (a slot is held) or park it behind its dependencies"""
+        if self._park_if_blocked(task):
+            self._slots.release()
+            return
+        self._safe_execute_task(task)
 
     def _safe_execute_task(self, task: Task) -> None:
-        """Execute a single task with proper context and error handling"""
+        """Submit a single task with its layered context; the slot is released when it finishes"""
         try:
             task.status = TaskStatus.RUNNING
-            
-            # Merge task context with global context
-            execution_context = self.context._data.copy()
+            self._journal({"op": "status", "id": task.id, "status": task.status.name})
+
+            # Task context over its plan scope over the global context
+            execution_context = (task.scope or self.context).snapshot()
             execution_context.update(task.context)
-            
-            future = self.executor.submit(task.callable, execution_context)
-            
-            try:
-                result = future.result(timeout=self.task_timeout)
-                task.result = result
-                task.status = TaskStatus.COMPLETED
-                self.logger.debug(f"Task {task.id} completed successfully")
-                
-                # Update global context with task results if provided
-                if isinstance(result, dict):
-                    self.context.update(result)
-                    
-            except TimeoutError:
-                self.logger.error(f"Task {task.id} timed out")
-                task.status = TaskStatus.FAILED
-                task.error = TimeoutError(f"Task timed out after {self.task_timeout} seconds")
-                future.cancel()
-            except Exception as e:
-                self.logger.error(f"Task {task.id} failed: {e}")
-                task.status = TaskStatus.FAILED
-                task.error = e
-                
+
+            batched = self.query_batcher is not None and task.callable == self._analyze_query
+            if batched:
+                future = self.query_batcher.submit(execution_context.get('query', ''))
+            else:
+                future = self.executor.submit(task.callable, execution_context)
+            with self.lock:
+                self._running[task.id] = (self.clock() + self.task_timeout, future, task)
+            if batched:
+                # The batcher has its own thread, so the worker slot is free right away
+                self._slots.release()
+            future.add_done_callback(lambda f, t=task, b=batched: self._on_task_done(t, f, not b))
         except Exception as e:
-            self.logger.error(f"Error executing task {task.id}: {e}")
+            self.logger.error("Error executing task %s: %s", task.id, e)
             task.status = TaskStatus.FAILED
             task.error = e
+            self._slots.release()
+            self._finish_task(task)
+
+    def _on_task_done(self, task: Task, future, release_slot: bool = True) -> None:
+        """Record the outcome of a finished executor (or query batcher) future"""
+        if release_slot:
+            self._slots.release()
+        with self.lock:
+            timed_out = self._running.pop(task.id, None) is None
+        if timed_out or future.cancelled():
+            return  # Already failed by _expire_timed_out
+
+        error = future.exception()
+        if error is None:
+            result = future.result()
+            task.result = result
+            task.status = TaskStatus.COMPLETED
+            self.logger.debug("Task %s completed successfully", task.id)
+
+            # Update the plan scope (or global context) with task results if provided
+            if isinstance(result, dict):
+                (task.scope or self.context).update(result)
+        else:
+            self.logger.error("Task %s failed: %s", task.id, error)
+            task.status = TaskStatus.FAILED
+            task.error = error
+
+        self._finish_task(task)
+
+    def _finish_task(self, task: Task) -> None:
+        """Notify listeners and release or fail tasks parked on this one"""
+        with self.lock:
+            dependents = self._waiting.pop(task.id, [])
+        if self.journal is not None:
+            self._journal(self._status_record(task))
+        self._notify(task)
+
+        for dependent in dependents:
+            if task.status == TaskStatus.COMPLETED:
+                # Re-queue; the dispatcher re-checks any remaining dependencies
+                self.task_queue.put(dependent.id, dependent, dependent.priority)
+            else:
+                dependent.status = TaskStatus.FAILED
+                dependent.error = RuntimeError(f"Dependency {task.id} failed")
+                self._finish_task(dependent)
 
     def start(self) -> None:
         """Start the decision maker in a separate thread"""
@@ -173,72 +442,216 @@ class DecisionMaker:
             threading.Thread(target=self.execute_tasks, daemon=True).start()
             self.logger.info("DecisionMaker started")
 
-    def stop(self) -> None:
-        """Stop the decision maker gracefully"""
+    def stop(self, wait: bool = True) -> None:
+        """Stop the decision maker gracefully
+
+        With ``wait=False`` tasks still running are not waited for; their
+        results are dropped and the journal keeps them pending.
+        """
         self.running = False
         
         # Cancel all pending tasks
-        while not self.task_queue.empty():
-            try:
-                _, task = self.task_queue.get_nowait()
-                task.status = TaskStatus.FAILED
-                task.error = InterruptedError("DecisionMaker stopped")
-            except queue.Empty:
-                break
+        for task in self.task_queue.drain():
+            task.status = TaskStatus.FAILED
+            task.error = InterruptedError("DecisionMaker stopped")
+            self._notify(task)
+
+        with self.lock:
+            parked = [task for tasks in self._waiting.values() for task in tasks]
+            self._waiting.clear()
+        for task in parked:
+            task.status = TaskStatus.FAILED
+            task.error = InterruptedError("DecisionMaker stopped")
+            self._notify(task)
                 
-        # Shutdown executor
-        self.executor.shutdown(wait=True)
+        # Shutdown executor; interrupted tasks stay pending in the journal
+        if self.query_batcher is not None:
+            self.query_batcher.close()
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+        if self.journal is not None:
+            self.journal.close()
         self.logger.info("DecisionMaker stopped")
 
-    def create_reasoning_plan(self, query: str) -> List[str]:
-        """Create a series of task IDs forming a reasoning plan"""
-        steps = [
-            {
-                'name': 'analyze_query',
-                'callable': self._analyze_query,
-                'priority': 100
-            },
-            {
-                'name': 'gather_context',
-                'callable': self._gather_context,
-                'priority': 90
-            },
-            {
-                'name': 'generate_solution',
-                'callable': self._generate_solution,
-                'priority': 80
-            },
-            {
-                'name': 'validate_solution',
-                'callable': self._validate_solution,
-                'priority': 70
-            }
-        ]
+    def create_reasoning_plan(self, query: str,
+                              scope: Optional[DecisionContext] = None,
+                              completed: Optional[Dict[str, Any]] = None,
+                              task_ids: Optional[List[str]] = None) -> List[str]:
+        """Create a series of task IDs forming a reasoning plan
 
-        task_ids = []
-        prev_task_id = None
+        Each plan runs in its own context scope so concurrent plans do not
+        see or overwrite each other's intermediate results. ``completed`` maps
+        step names to results of steps that already ran elsewhere; those steps
+        are restored as completed instead of being executed again.
+        ``task_ids`` reuses existing IDs when a plan is restored.
+        """
+        if scope is None:
+            scope = self.context.scope()
+        completed = completed or {}
 
-        for step in steps:
-            task_id = self.add_task(
-                step['callable'],
+        tasks = []
+        for index, step in enumerate(self.REASONING_STEPS):
+            task = Task(
+                id=task_ids[index] if task_ids else self._get_next_task_id(),
+                callable=getattr(self, '_' + step['name']),
+                dependencies=[tasks[-1].id] if tasks else [],
                 priority=step['priority'],
-                dependencies=[prev_task_id] if prev_task_id else None,
-                context={'query': query}
+                context={'query': query},
+                scope=scope,
+                name=step['name']
             )
-            task_ids.append(task_id)
-            prev_task_id = task_id
+            if step['name'] in completed:
+                task.status = TaskStatus.COMPLETED
+                task.result = completed[step['name']]
+                if isinstance(task.result, dict):
+                    scope.update(task.result)
+            tasks.append(task)
+
+        plan_id = tasks[0].id
+        task_ids = [task.id for task in tasks]
+        for task in tasks:
+            task.plan_id = plan_id
+        with self.lock:
+            self._plans[plan_id] = (query, task_ids)
+        seq = self._journal({"op": "plan", "id": plan_id, "query": query, "tasks": task_ids})
 
+        for task in tasks:
+            if task.status == TaskStatus.COMPLETED:
+                seq = self._journal(self._status_record(task))
+                with self.lock:
+                    self.active_tasks[task.id] = task
+            else:
+                self._enqueue(task)
+
+        self._wait_durable(seq)
         return task_ids
 
+    def _journal(self, record: Dict[str, Any]) -> int:
+        """Append a record to the journal, if any; returns its sequence number (0 if none)"""
+        if self.journal is None or self._replaying:
+            return 0
+        try:
+            return self.journal.append(record)
+        except ValueError:
+            # stop(wait=False) closes the journal while tasks may still finish; append checks under its lock
+            if not self.journal.closed:
+                raise
+            return 0
+
+    def _wait_durable(self, seq: int) -> None:
+        """Block until journal record ``seq`` is committed
+
+        Submissions return only once they would survive a crash. Concurrent
+        submitters share one group commit, so this costs one fsync per batch
+        rather than per task.
+        """
+        if seq:
+            self.journal.wait(seq)
+
+    def _submit_record(self, task: Task) -> Dict[str, Any]:
+        return {"op": "submit", "id": task.id, "fn": callable_ref(task.callable),
+                "priority": task.priority, "deps": task.dependencies, "context": task.context}
+
+    def _status_record(self, task: Task) -> Dict[str, Any]:
+        record = {"op": "status", "id": task.id, "status": task.status.name}
+        if task.status == TaskStatus.COMPLETED:
+            record["result"] = task.result
+        elif task.error is not None:
+            record["error"] = str(task.error)
+        return record
+
+    def _journal_snapshot(self) -> List[Dict[str, Any]]:
+        """Minimal records that recreate every unfinished plan and task"""
+        with self.lock:
+            tasks = list(self.active_tasks.values())
+            plans = dict(self._plans)
+
+        records = []
+        for plan_id, (query, task_ids) in plans.items():
+            steps = [self.active_tasks.get(task_id) for task_id in task_ids]
+            if all(step is None or step.status in TERMINAL_STATUSES for step in steps):
+                with self.lock:
+                    self._plans.pop(plan_id, None)
+                continue
+            records.append({"op": "plan", "id": plan_id, "query": query, "tasks": task_ids})
+            records.extend(self._status_record(step) for step in steps
+                           if step.status == TaskStatus.COMPLETED)
+
+        live = [task for task in tasks if task.status not in TERMINAL_STATUSES]
+        needed = {dep_id for task in live for dep_id in task.dependencies or ()}
+        for task in tasks:
+            if task.plan_id is not None:
+                continue
+            if task.status in TERMINAL_STATUSES and task.id not in needed:
+                continue
+            records.append(self._submit_record(task))
+            if task.status in TERMINAL_STATUSES:
+                records.append(self._status_record(task))
+        return records
+
+    def _recover(self, state: JournalState) -> None:
+        """Restore unfinished plans and tasks from a replayed journal"""
+        self._task_counter = max(self._task_counter, state.max_task_number)
+        restored = 0
+        self._replaying = True
+        try:
+            for plan_id, plan in state.plans.items():
+                records = [state.tasks.get(task_id, {}) for task_id in plan['tasks']]
+                statuses = [record.get('status', 'PENDING') for record in records]
+                if all(status in ('COMPLETED', 'FAILED') for status in statuses):
+                    continue
+                if 'FAILED' in statuses:
+                    self.logger.warning("Not recovering plan %s: a step failed", plan_id)
+                    continue
+                completed = {
+                    step['name']: record.get('result')
+                    for step, record in zip(self.REASONING_STEPS, records)
+                    if record.get('status') == 'COMPLETED'
+                }
+                self.create_reasoning_plan(plan['query'], completed=completed, task_ids=plan['tasks'])
+                restored += len(plan['tasks']) - len(completed)
+
+            standalone = sorted(
+                (task_id for task_id, record in state.tasks.items()
+                 if 'plan' not in record and 'priority' in record),
+                key=lambda task_id: int(task_id.rsplit('_', 1)[1])
+            )
+            for task_id in standalone:
+                record = state.tasks[task_id]
+                task = Task(
+                    id=task_id,
+                    callable=resolve_callable(record.get('fn')),
+                    dependencies=record.get('deps') or [],
+                    priority=record.get('priority', 0),
+                    context=record.get('context') or {}
+                )
+                status = record.get('status', 'PENDING')
+                if status == 'COMPLETED':
+                    task.status = TaskStatus.COMPLETED
+                    task.result = record.get('result')
+                elif status == 'FAILED' or task.callable is None:
+                    task.status = TaskStatus.FAILED
+                    task.error = RuntimeError(record.get('error') or f"Task {task_id} cannot be recovered")
+                else:
+                    self._enqueue(task)
+                    restored += 1
+                    continue
+                with self.lock:
+                    self.active_tasks[task_id] = task
+        finally:
+            self._replaying = False
+
+        if state.records:
+            self.logger.info("Recovered %d pending task(s) from %d journal records", restored, state.records)
+
     # Example reasoning step implementations
     def _analyze_query(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        query = context.get('query', '')
-        # Implement query analysis logic here
-        return {'query_components': ['component1', 'component2']}
+        # Per-query path; with a query batcher these steps are analyzed in batches instead
+        return analyze_query(context.get('query', ''))
 
     def _gather_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        # Implement context gathering logic here
-        return {'additional_context': 'some_context'}
+        if self.retriever is None:
+            return {'additional_context': []}
+        return {'additional_context': self.retriever.search(context.get('query', ''), k=self.retrieval_k)}
 
     def _generate_solution(self, context: Dict[str, Any]) -> Dict[str, Any]:
         # Implement solution generation logic here
@@ -17,6 +17,7 @@ class InteractiveInterpreter:
         self.running = False
         self.command_queue = queue.Queue()
         self.command_handler: Optional[Callable] = None
+        self.stop_handler: Optional[Callable[[], None]] = None
         self._input_thread: Optional[threading.Thread] = None
         self._process_thread: Optional[threading.Thread] = None
 
@@ -24,6 +25,10 @@ class InteractiveInterpreter:
         """Set the callback handler for processing commands"""
         self.command_handler = handler
 
+    def set_stop_handler(self, handler: Callable[[], None]):
+        """Set the callback invoked once the interpreter stops (``exit``, EOF or ``stop()``)"""
+        self.stop_handler = handler
+
     def start_async(self):
         """Start the interpreter in non-blocking mode"""
         self.running = True
@@ -42,6 +47,9 @@ class InteractiveInterpreter:
             try:
                 # Get input without blocking main thread
                 command = input(">>> ")
+                if command.strip() in ("exit", "quit"):
+                    self.stop()
+                    break
                 if command.strip():
                     self.command_queue.put(command)
             except EOFError:
@@ -56,7 +64,9 @@ class InteractiveInterpreter:
             try:
                 # Get command with timeout to allow checking running state
                 command = self.command_queue.get(timeout=0.1)
-                
+                if command is None:
+                    continue  # Wake-up from stop()
+
                 # Execute in interpreter context
                 result = self._execute_command(command)
                 
@@ -81,14 +91,15 @@ class InteractiveInterpreter:
 
     def stop(self):
         """Stop the interpreter gracefully"""
-        self.running = False
-        
-        # Wait for threads to finish
-        if self._input_thread and self._input_thread.is_alive():
-            self._input_thread.join(timeout=1.0)
-        if self._process_thread and self._process_thread.is_alive():
-            self._process_thread.join(timeout=1.0)
-            
+        was_running, self.running = self.running, False
+        self.command_queue.put(None)  # Wake the process loop instead of waiting out its poll
+
+        # The input thread is a daemon blocked in input(), which cannot be
+        # interrupted, so it is not joined; it exits after the next line
+        process_thread = self._process_thread
+        if process_thread and process_thread.is_alive() and process_thread is not threading.current_thread():
+            process_thread.join(timeout=1.0)
+
         # Clear command queue
         while not self.command_queue.empty():
             try:
@@ -97,6 +108,8 @@ class InteractiveInterpreter:
                 break
 
         self.logger.info("Interpreter stopped")
+        if was_running and self.stop_handler:
+            self.stop_handler()
 
     def add_task(self, task):
         self.agent.decision_maker.add_task(task)
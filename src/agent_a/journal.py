@@ -0,0 +1,213 @@
+import importlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+@dataclass
+class JournalState:
+    """Task and plan state rebuilt by replaying a journal"""
+    tasks: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # task id -> latest record fields
+    plans: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # plan id -> {'query', 'tasks'}
+    max_task_number: int = 0
+    records: int = 0
+
+
+class TaskJournal:
+    """Append-only JSON-lines journal of task submissions, transitions and results
+
+    Appends only buffer the record. A writer thread writes whatever has
+    accumulated and fsyncs once per batch (group commit), so many tasks share
+    one fsync. ``wait()`` blocks until a given record is durable. Once
+    ``compact_every`` records have been written, the journal is rewritten from
+    a snapshot of live state supplied via ``set_snapshot``.
+
+    Record kinds:
+      ``{"op": "submit", "id", "fn", "priority", "deps", "context"}`` standalone task
+      ``{"op": "plan", "id", "query", "tasks"}`` reasoning plan and its step task ids
+      ``{"op": "status", "id", "status", "result"?, "error"?}`` state transition
+    """
+
+    def __init__(self, path: str, fsync: bool = True, compact_every: int = 1_000_000):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self._file = open(path, "a", encoding="utf-8")
+        self._buffer: List[str] = []
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._appended = 0
+        self._committed = 0
+        self._since_compact = 0
+        self._closing = False
+        self._snapshot: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Queue a record for the next group commit; returns its sequence number"""
+        line = json.dumps(record, default=repr, separators=(",", ":"))
+        with self._cond:
+            if self._closing:
+                raise ValueError("Journal is closed")
+            self._buffer.append(line)
+            self._appended += 1
+            if len(self._buffer) == 1:
+                self._cond.notify_all()
+            return self._appended
+
+    def wait(self, seq: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """Block until record ``seq`` (default: everything appended so far) is durable"""
+        with self._cond:
+            target = self._appended if seq is None else seq
+            return self._cond.wait_for(lambda: self._committed >= target, timeout)
+
+    @property
+    def closed(self) -> bool:
+        return self._closing
+
+    def set_snapshot(self, snapshot: Callable[[], Iterable[Dict[str, Any]]]):
+        """Register the callable that yields records describing all live state"""
+        self._snapshot = snapshot
+
+    def close(self):
+        """Commit outstanding records and close the file"""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._buffer or self._closing)
+                if not self._buffer:
+                    return
+                batch, self._buffer = self._buffer, []
+                upto = self._appended
+
+            with self._io_lock:
+                self._file.write("\n".join(batch) + "\n")
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+
+            with self._cond:
+                self._committed = upto
+                self._since_compact += len(batch)
+                self._cond.notify_all()
+                due = self._snapshot is not None and self._since_compact >= self.compact_every
+
+            if due:
+                try:
+                    self.compact()
+                except Exception as e:
+                    self.logger.error("Journal compaction failed: %s", e)
+
+    def compact(self):
+        """Rewrite the journal from the live-state snapshot"""
+        if self._snapshot is None:
+            return
+        tmp_path = self.path + ".compact"
+        with self._io_lock:
+            # Buffered records are newer than the snapshot and land in the new file
+            count = 0
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                for record in self._snapshot():
+                    out.write(json.dumps(record, default=repr, separators=(",", ":")) + "\n")
+                    count += 1
+                out.flush()
+                os.fsync(out.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._fsync_dir()
+            self._file = open(self.path, "a", encoding="utf-8")
+        with self._cond:
+            self._since_compact = 0
+        self.logger.info("Compacted journal to %d records", count)
+
+    def _fsync_dir(self):
+        if not self.fsync:
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass  # Not supported on every platform
+        finally:
+            os.close(fd)
+
+    def replay(self) -> JournalState:
+        """Rebuild task and plan state from the journal on disk"""
+        state = JournalState()
+        if not os.path.exists(self.path):
+            return state
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash; everything before it is intact
+                    self.logger.warning("Ignoring corrupt journal record after %d records", state.records)
+                    break
+                state.records += 1
+                op = record.get("op")
+                if op == "plan":
+                    state.plans[record["id"]] = {"query": record["query"], "tasks": record["tasks"]}
+                    for task_id in record["tasks"]:
+                        state.tasks.setdefault(task_id, {"status": "PENDING", "plan": record["id"]})
+                        self._track_id(state, task_id)
+                elif op == "submit":
+                    task = state.tasks.setdefault(record["id"], {"status": "PENDING"})
+                    task.update(fn=record.get("fn"), priority=record.get("priority", 0),
+                                deps=record.get("deps", []), context=record.get("context", {}))
+                    self._track_id(state, record["id"])
+                elif op == "status":
+                    task = state.tasks.setdefault(record["id"], {})
+                    task["status"] = record["status"]
+                    if "result" in record:
+                        task["result"] = record["result"]
+                    if "error" in record:
+                        task["error"] = record["error"]
+                    self._track_id(state, record["id"])
+        return state
+
+    @staticmethod
+    def _track_id(state: JournalState, task_id: str):
+        try:
+            number = int(task_id.rsplit("_", 1)[1])
+        except (IndexError, ValueError):
+            return
+        if number > state.max_task_number:
+            state.max_task_number = number
+
+
+def callable_ref(fn: Callable) -> Optional[str]:
+    """Return an importable ``module:qualname`` reference, or None for lambdas and closures"""
+    module = getattr(fn, "__module__", None)
+    qualname = getattr(fn, "__qualname__", None)
+    if not module or not qualname or "<" in qualname:
+        return None
+    return f"{module}:{qualname}"
+
+
+def resolve_callable(ref: Optional[str]) -> Optional[Callable]:
+    """Import the callable named by ``callable_ref``; None if it cannot be found"""
+    if not ref:
+        return None
+    module_name, _, qualname = ref.partition(":")
+    try:
+        obj = importlib.import_module(module_name)
+        for attr in qualname.split("."):
+            obj = getattr(obj, attr)
+    except (ImportError, AttributeError):
+        return None
+    return obj if callable(obj) else None
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from .decision_maker import TERMINAL_STATUSES, Task
+
+# A startup step: a callable taking the results of the steps it depends on
+Step = Tuple[Callable[[Dict[str, Any]], Any], Sequence[str]]
+
+
+@dataclass
+class LifecycleTimings:
+    """Where the time of one start/stop cycle went, in seconds"""
+    components: Dict[str, float] = field(default_factory=dict)  # build time of each component
+    startup: Optional[float] = None   # start request until every component is built
+    ready: Optional[float] = None     # start request until work is dispatched and commands accepted
+    drain: Optional[float] = None     # intake stopped until in-flight work finished (or the deadline)
+    shutdown: Optional[float] = None  # stopping the components
+    abandoned: int = 0                # in-flight tasks still unfinished at the drain deadline
+
+    def summary(self) -> str:
+        fmt = lambda v: "-" if v is None else f"{v * 1000:.1f} ms"
+        parts = ", ".join(f"{name} {fmt(seconds)}" for name, seconds in self.components.items())
+        return (f"startup {fmt(self.startup)} ({parts}), ready {fmt(self.ready)}, "
+                f"drain {fmt(self.drain)} ({self.abandoned} abandoned), shutdown {fmt(self.shutdown)}")
+
+
+def start_parallel(steps: Dict[str, Step], timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Run startup steps concurrently, each as soon as its dependencies are done
+
+    Returns each step's result by name. Steps are timed individually (not
+    counting the wait for their dependencies) into ``timings``. If a step
+    fails, the steps depending on it are skipped and the first error is
+    raised once everything else has finished.
+    """
+    futures: Dict[str, Future] = {}
+
+    def run(name: str, fn: Callable[[Dict[str, Any]], Any], after: Sequence[str]) -> Any:
+        inputs = {dependency: futures[dependency].result() for dependency in after}
+        started = time.monotonic()
+        result = fn(inputs)
+        if timings is not None:
+            timings[name] = time.monotonic() - started
+        return result
+
+    # One thread per step, so a step blocked on its dependencies never starves another
+    with ThreadPoolExecutor(max_workers=max(len(steps), 1), thread_name_prefix="agent-a-start") as pool:
+        for name, (fn, after) in steps.items():
+            missing = [dependency for dependency in after if dependency not in futures]
+            if missing:
+                raise ValueError(f"Step {name} depends on unknown or later steps: {missing}")
+            futures[name] = pool.submit(run, name, fn, after)
+    errors = [future.exception() for future in futures.values() if future.exception() is not None]
+    if errors:
+        raise errors[0]
+    return {name: future.result() for name, future in futures.items()}
+
+
+class InFlight:
+    """Task ids a drain waits for, removed as the decision maker finishes them"""
+
+    def __init__(self, decision_maker):
+        self.decision_maker = decision_maker
+        self._lock = threading.Lock()
+        self._ids = set()
+        self._idle = threading.Event()
+        self._idle.set()
+        decision_maker.add_listener(self._on_finished)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, task_ids: Iterable[str]) -> None:
+        # Checked under the lock: a task finishing meanwhile is skipped here or removed by the listener
+        with self._lock:
+            for task_id in task_ids:
+                status = self.decision_maker.get_task_status(task_id)
+                if status is not None and status not in TERMINAL_STATUSES:
+                    self._ids.add(task_id)
+            if self._ids:
+                self._idle.clear()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every tracked task has finished; False on timeout"""
+        return self._idle.wait(timeout)
+
+    def close(self) -> None:
+        self.decision_maker.remove_listener(self._on_finished)
+
+    def _on_finished(self, task: Task) -> None:
+        with self._lock:
+            self._ids.discard(task.id)
+            if not self._ids:
+                self._idle.set()
+
+
+class Lifecycle:
+    """Start/ready/stop state of a long-running agent, with timings
+
+    ``stop_requested`` is set by ``request_stop`` (signals, the interpreter's
+    ``exit``) and is what ``AgentA.run`` waits on. ``ready`` and ``stopped``
+    let other threads wait for those transitions instead of polling.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.timings = LifecycleTimings()
+        self.ready = threading.Event()
+        self.stop_requested = threading.Event()
+        self.stopped = threading.Event()
+        self._origin = time.monotonic()
+
+    def begin(self) -> None:
+        """Start a new cycle; startup and ready are measured from here"""
+        self.timings = LifecycleTimings()
+        self._origin = time.monotonic()
+        self.stop_requested.clear()
+        self.stopped.clear()
+
+    def mark_started(self) -> None:
+        self.timings.startup = time.monotonic() - self._origin
+
+    def mark_ready(self) -> None:
+        self.timings.ready = time.monotonic() - self._origin
+        self.ready.set()
+        self.logger.info("Ready in %.1f ms", self.timings.ready * 1000)
+
+    def request_stop(self) -> None:
+        """Ask the owner to drain and stop; safe from signal handlers and any thread"""
+        self.stop_requested.set()
+
+    def mark_stopped(self, shutdown: float) -> None:
+        self.timings.shutdown = shutdown
+        self.ready.clear()
+        self.stopped.set()
+        self.logger.info("Lifecycle: %s", self.timings.summary())
@@ -0,0 +1,197 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, TextIO, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+_configured: Optional[logging.Logger] = None  # Logger the last configure_logging call set up
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=repr)
+
+
+class RateLimitFilter(logging.Filter):
+    """Cap how often records sharing a message template get through
+
+    Records are keyed by logger and unformatted message, so per-task lines
+    such as ``"Task %s failed: %s"`` count as one stream. Each stream may emit
+    ``burst`` records per ``interval`` seconds. Records at ``exempt_level`` or
+    above always pass. When a stream resumes, its next record carries a
+    ``suppressed`` count of the records dropped meanwhile (shown in JSON output).
+    Windows idle for a whole ``interval`` are pruned once per interval, so
+    streams that stop do not pile up.
+    """
+
+    def __init__(self, burst: int = 10, interval: float = 1.0,
+                 exempt_level: int = logging.ERROR):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.exempt_level = exempt_level
+        self._windows: Dict[Tuple[str, str], list] = {}  # key -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+        self._next_prune = time.monotonic() + interval
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_prune:
+                self._prune(now)
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+    def _prune(self, now: float) -> None:
+        """Drop windows that have expired (lock held)"""
+        self._windows = {key: window for key, window in self._windows.items()
+                         if now - window[0] < self.interval}
+        self._next_prune = now + self.interval
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every ``every`` records per message template below ``exempt_level``
+
+    At most ``max_keys`` templates are counted; past that the counts start over.
+    """
+
+    def __init__(self, every: int = 100, exempt_level: int = logging.WARNING,
+                 max_keys: int = 10_000):
+        super().__init__()
+        self.every = max(1, every)
+        self.exempt_level = exempt_level
+        self.max_keys = max_keys
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.name, str(record.msg))
+        with self._lock:
+            count = self._counts.get(key, 0)
+            if count == 0 and len(self._counts) >= self.max_keys:
+                self._counts.clear()
+            self._counts[key] = (count + 1) % self.every
+        return count == 0
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread
+
+    The stock handler formats every record on the calling thread before
+    enqueueing it. Within one process the record can be handed over as is,
+    so callers only pay for the enqueue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# mode -> (level, asynchronous, json output, rate limited)
+PRESETS = {
+    "debug": (logging.DEBUG, False, False, False),
+    "async": (logging.DEBUG, True, False, False),
+    "production": (logging.INFO, True, True, True),
+}
+
+
+def configure_logging(mode: str = "debug", logger_name: str = "agent_a",
+                      level: Optional[int] = None, json_output: Optional[bool] = None,
+                      rate_limit: Optional[bool] = None, sample_every: Optional[int] = None,
+                      stream: Optional[TextIO] = None) -> logging.Logger:
+    """Configure the package logger for one of the ``PRESETS`` modes
+
+    ``debug`` writes synchronously, as before. ``async`` moves formatting and
+    writing to a background QueueListener thread. ``production`` is async,
+    INFO level, JSON and rate limited. Explicit arguments override the preset.
+    Reconfiguring removes the handler installed by the previous call, even
+    if that was on a different logger.
+    """
+    if mode not in PRESETS:
+        raise ValueError(f"Unknown logging mode: {mode}")
+    preset_level, asynchronous, preset_json, preset_rate_limit = PRESETS[mode]
+    level = preset_level if level is None else level
+    json_output = preset_json if json_output is None else json_output
+    rate_limit = preset_rate_limit if rate_limit is None else rate_limit
+
+    global _configured
+    shutdown_logging()
+    if _configured is not None:
+        _configured.handlers.clear()
+        _configured.setLevel(logging.NOTSET)
+    logger = _configured = logging.getLogger(logger_name)
+    logger.handlers.clear()
+    logger.setLevel(level)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setLevel(level)
+    handler.setFormatter(JsonFormatter() if json_output else logging.Formatter(LOG_FORMAT))
+
+    if asynchronous:
+        global _listener
+        records = queue.SimpleQueue()
+        front = _LazyQueueHandler(records)
+        with _listener_lock:
+            _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+            _listener.start()
+    else:
+        front = handler
+
+    # Filters run on the caller's thread, before anything is queued or formatted
+    if rate_limit:
+        front.addFilter(RateLimitFilter())
+    if sample_every:
+        front.addFilter(SamplingFilter(sample_every))
+    logger.addHandler(front)
+    return logger
+
+
+def shutdown_logging():
+    """Flush and stop the background listener, if one is running"""
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+atexit.register(shutdown_logging)
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Callable, List
+from typing import Dict, Any, Callable, List, Optional
 import logging
 from dataclasses import dataclass
 import threading
@@ -10,9 +10,19 @@ class Module:
     dependencies: List[str] = None
     provides: List[str] = None
 
+_MISSING = object()
+
 class ModuleContext:
-    def __init__(self):
-        self._data = {}
+    """Module key/value context, optionally layered over a parent context
+
+    Request scopes read through to the shared parent without locking and
+    keep their own writes local.
+    """
+
+    def __init__(self, parent: Optional["ModuleContext"] = None,
+                 data: Optional[Dict[str, Any]] = None):
+        self._data = dict(data or {})
+        self._parent = parent
         self._lock = threading.Lock()
 
     def set(self, key: str, value: Any):
@@ -20,8 +30,16 @@ class ModuleContext:
             self._data[key] = value
 
     def get(self, key: str) -> Any:
-        with self._lock:
-            return self._data.get(key)
+        value = self._data.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self._parent is not None:
+            return self._parent.get(key)
+        return None
+
+    def scope(self, data: Optional[Dict[str, Any]] = None) -> "ModuleContext":
+        """Create a request-scoped child context"""
+        return ModuleContext(parent=self, data=data)
 
 class Modularity:
     def __init__(self):
@@ -30,61 +48,89 @@ class Modularity:
         self.context = ModuleContext()
         self._lock = threading.Lock()
 
+    def _resolve(self, dependency: str, modules: Optional[Dict[str, Module]] = None) -> str:
+        """Resolve a dependency given as a module name or a provided capability"""
+        modules = self.modules if modules is None else modules
+        if dependency in modules:
+            return dependency
+        for module in modules.values():
+            if module.provides and dependency in module.provides:
+                return module.name
+        raise KeyError(dependency)
+
     def register_module(self, module: Module):
         """Register a new module with dependency checking"""
         with self._lock:
             # Check dependencies
             if module.dependencies:
-                missing = [dep for dep in module.dependencies if dep not in self.modules]
+                missing = []
+                for dep in module.dependencies:
+                    try:
+                        self._resolve(dep)
+                    except KeyError:
+                        missing.append(dep)
                 if missing:
                     raise ValueError(f"Missing dependencies for module {module.name}: {missing}")
             
-            self.modules[module.name] = module
-            self.logger.info(f"Registered module: {module.name}")
+            # Copy-on-write so extend() can iterate without taking the lock
+            modules = dict(self.modules)
+            modules[module.name] = module
+            self.modules = modules
+            self.logger.info("Registered module: %s", module.name)
 
     def unregister_module(self, name: str):
         """Unregister a module with dependency checking"""
         with self._lock:
             if name in self.modules:
                 # Check if any other modules depend on this one
+                provided = {name, *(self.modules[name].provides or [])}
                 dependent_modules = [
                     m.name for m in self.modules.values()
-                    if m.dependencies and name in m.dependencies
+                    if m.dependencies and provided.intersection(m.dependencies)
                 ]
                 if dependent_modules:
                     raise ValueError(f"Cannot remove module {name}, required by: {dependent_modules}")
                 
-                del self.modules[name]
-                self.logger.info(f"Unregistered module: {name}")
+                modules = dict(self.modules)
+                del modules[name]
+                self.modules = modules
+                self.logger.info("Unregistered module: %s", name)
+
+    def extend(self, context: Optional[ModuleContext] = None):
+        """Execute modules in dependency order
 
-    def extend(self):
-        """Execute modules in dependency order"""
+        Pass a scoped ``context`` to run the pipeline for one request without
+        touching the shared context.
+        """
+        if context is None:
+            context = self.context
+        modules = self.modules
         executed = set()
         
         def execute_module(name: str):
             if name in executed:
                 return
                 
-            module = self.modules[name]
+            module = modules[name]
             
             # Execute dependencies first
             if module.dependencies:
                 for dep in module.dependencies:
-                    execute_module(dep)
+                    execute_module(self._resolve(dep, modules))
             
             try:
-                module.execute(self.context)
+                module.execute(context)
                 executed.add(name)
             except Exception as e:
-                self.logger.error(f"Error executing module {name}: {e}")
+                self.logger.error("Error executing module %s: %s", name, e)
                 raise
 
         # Execute all modules
-        for name in self.modules:
+        for name in modules:
             try:
                 execute_module(name)
             except Exception as e:
-                self.logger.error(f"Module execution failed: {e}")
+                self.logger.error("Module execution failed: %s", e)
 
     def cleanup(self):
         """Cleanup method to properly shutdown modularity"""
@@ -97,5 +143,5 @@ class Modularity:
                 except Exception as e:
                     self.logger.error(f"Error cleaning up module {module.name}: {e}")
             
-            self.modules.clear()
+            self.modules = {}
             self.context = ModuleContext()
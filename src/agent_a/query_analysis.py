@@ -0,0 +1,222 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+DEFAULT_FEATURES = 1 << 20
+
+# Tokens are runs of ASCII letters, digits, underscores and non-ASCII bytes
+# (so multi-byte UTF-8 characters are never split), matched after ASCII lowercasing.
+_TOKEN_RE = re.compile(rb"[a-z0-9_\x80-\xff]+")
+_WORD_BYTES = np.zeros(256, dtype=bool)
+for _low, _high in ((ord("a"), ord("z")), (ord("0"), ord("9")), (0x80, 0xFF)):
+    _WORD_BYTES[_low:_high + 1] = True
+_WORD_BYTES[ord("_")] = True
+
+# Token hash: polynomial over the bytes modulo 2**64, then a splitmix-style finalizer
+_MASK = (1 << 64) - 1
+_PRIME = 0x100000001B3
+_PRIME_INV = pow(_PRIME, -1, 1 << 64)
+_MIX = 0xBF58476D1CE4E5B9
+
+_powers_lock = threading.Lock()
+_powers = np.ones(1, dtype=np.uint64)      # _PRIME ** k
+_inv_powers = np.ones(1, dtype=np.uint64)  # _PRIME_INV ** k
+_MAX_CACHED_POWERS = 1 << 22                # 32 MiB per table
+
+
+def _hash_bytes(token: bytes) -> int:
+    h = 0
+    for byte in token:
+        h = (h * _PRIME + byte) & _MASK
+    h ^= h >> 31
+    h = (h * _MIX) & _MASK
+    return h ^ (h >> 29)
+
+
+def analyze_query(query: str, n_features: int = DEFAULT_FEATURES) -> Dict[str, Any]:
+    """Tokenize and feature-hash a single query"""
+    tokens = _TOKEN_RE.findall(query.encode("utf-8").lower())
+    return {
+        'query_components': [token.decode("utf-8", "replace") for token in tokens],
+        'query_features': [_hash_bytes(token) % n_features for token in tokens],
+    }
+
+
+def _build_power_tables(size: int):
+    powers = np.full(size, _PRIME, dtype=np.uint64)
+    inv_powers = np.full(size, _PRIME_INV, dtype=np.uint64)
+    powers[0] = inv_powers[0] = 1
+    # uint64 products wrap around, which is exactly arithmetic mod 2**64
+    return np.cumprod(powers, dtype=np.uint64), np.cumprod(inv_powers, dtype=np.uint64)
+
+
+def _power_tables(n: int):
+    """Powers of the hash prime and its inverse up to ``n``, grown on demand
+
+    Tables up to ``_MAX_CACHED_POWERS`` entries are kept for reuse; larger
+    ones are built for the caller only, so one huge batch does not pin its
+    tables in memory for the life of the process.
+    """
+    global _powers, _inv_powers
+    if n >= _MAX_CACHED_POWERS:
+        return _build_power_tables(n + 1)
+    with _powers_lock:
+        if len(_powers) <= n:
+            size = min(max(n + 1, 2 * len(_powers)), _MAX_CACHED_POWERS)
+            _powers, _inv_powers = _build_power_tables(size)
+        return _powers, _inv_powers
+
+
+def _scan(texts: List[Union[str, bytes]]):
+    """Vectorized tokenizer pass over a batch of texts (str, or UTF-8 bytes)
+
+    Returns the joined, lowercased byte buffer, its word-byte mask, token
+    start and end offsets, and the index of the text each token came from.
+    """
+    encoded = [text if isinstance(text, bytes) else text.encode("utf-8") for text in texts]
+    # The trailing separator guarantees every token ends inside the buffer
+    data = np.frombuffer(b" ".join(encoded).lower() + b" ", dtype=np.uint8)
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    offsets = np.cumsum(lengths + 1) - (lengths + 1)
+
+    word = _WORD_BYTES[data]
+    edges = np.diff(word.view(np.int8), prepend=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    owners = np.searchsorted(offsets, starts, side="right") - 1
+    return data, word, starts, ends, owners
+
+
+def _features(data: np.ndarray, starts: np.ndarray, ends: np.ndarray, n_features: int) -> np.ndarray:
+    """Hash every token ``data[starts[i]:ends[i]]`` into ``[0, n_features)`` at once
+
+    Uses prefix sums of the bytes weighted by inverse prime powers, so each
+    token hash is one subtraction and one multiplication.
+    """
+    powers, inv_powers = _power_tables(len(data))
+    prefix = np.zeros(len(data) + 1, dtype=np.uint64)
+    np.cumsum(data.astype(np.uint64) * inv_powers[:len(data)], dtype=np.uint64, out=prefix[1:])
+    hashes = (prefix[ends] - prefix[starts]) * powers[ends - 1]
+    hashes ^= hashes >> np.uint64(31)
+    hashes *= np.uint64(_MIX)
+    hashes ^= hashes >> np.uint64(29)
+    return (hashes % np.uint64(n_features)).astype(np.int64)
+
+
+def hash_tokens(texts: List[Union[str, bytes]], n_features: int = DEFAULT_FEATURES) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature ids of every token in ``texts`` and the index of the text each came from"""
+    if not texts:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    data, _, starts, ends, owners = _scan(texts)
+    return _features(data, starts, ends, n_features), owners
+
+
+def analyze_queries(queries: List[str], n_features: int = DEFAULT_FEATURES) -> List[Dict[str, Any]]:
+    """Tokenize and feature-hash a batch of queries in one pass
+
+    Token boundaries, owners and hashes for the whole batch come from array
+    operations over one joined buffer (see ``_scan`` and ``_features``). The
+    token strings come from a single decode of the buffer after it is
+    compacted to space-separated tokens. Results match ``analyze_query``
+    for every query.
+    """
+    if not queries:
+        return []
+    data, word, starts, ends, owners = _scan(queries)
+    features = _features(data, starts, ends, n_features).tolist()
+
+    # Keep token bytes plus the single byte after each token, as a space
+    keep = word.copy()
+    keep[ends] = True
+    compact = np.where(word, data, np.uint8(0x20))[keep]
+    tokens = compact.tobytes().decode("utf-8", "replace").split(" ")[:-1]
+
+    bounds = np.searchsorted(owners, np.arange(len(queries) + 1)).tolist()
+    return [
+        {
+            'query_components': tokens[first:last],
+            'query_features': features[first:last],
+        }
+        for first, last in zip(bounds, bounds[1:])
+    ]
+
+
+class QueryBatcher:
+    """Micro-batch queries submitted from many plans into ``analyze_queries`` calls
+
+    A batch closes once ``max_batch`` queries are waiting or ``window``
+    seconds after its first query arrived, whichever comes first, and is
+    analyzed on the batcher's own thread.
+    """
+
+    def __init__(self, analyze: Callable[[List[str]], List[Dict[str, Any]]] = analyze_queries,
+                 max_batch: int = 512, window: float = 0.002):
+        self.logger = logging.getLogger(__name__)
+        self.analyze = analyze
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: List[tuple] = []  # (arrival time, query, future)
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, query: str) -> Future:
+        """Queue a query; the future resolves with its analysis"""
+        future = Future()
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("QueryBatcher is closed")
+            self._pending.append((time.monotonic(), query, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def close(self):
+        """Analyze what is already queued, then stop the batching thread"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _next_batch(self) -> Optional[List[tuple]]:
+        with self._cond:
+            while True:
+                if self._pending:
+                    wait = self._pending[0][0] + self.window - time.monotonic()
+                    if wait <= 0 or len(self._pending) >= self.max_batch or self._closing:
+                        break
+                    self._cond.wait(wait)
+                elif self._closing:
+                    return None
+                else:
+                    self._cond.wait()
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            # Futures cancelled meanwhile (e.g. timed out tasks) are dropped
+            batch = [(query, future) for _, query, future in batch
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.analyze([query for query, _ in batch])
+            except Exception as e:
+                self.logger.error("Query batch of %d failed: %s", len(batch), e)
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,448 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only writers within one process are serialized
+    fcntl = None
+
+from .query_analysis import DEFAULT_FEATURES, hash_tokens
+
+MANIFEST = "manifest.json"
+_TOKENIZE_BYTES = 1 << 20  # text hashed per vectorized pass (a longer document gets a pass of its own)
+_MERGE_POSTINGS = 1 << 21  # postings held in memory per block of a merge
+_COPY_BYTES = 64 << 20     # text copied per step of a merge
+
+
+def _byte_chunks(texts: List[bytes], limit: int):
+    """(first, last) ranges of ``texts`` holding about ``limit`` bytes each"""
+    first, size = 0, 0
+    for i, text in enumerate(texts):
+        size += len(text) + 1
+        if size >= limit:
+            yield first, i + 1
+            first, size = i + 1, 0
+    if first < len(texts):
+        yield first, len(texts)
+
+
+def _create(path: str, name: str, dtype, length: int) -> np.ndarray:
+    """Writable memory map of a new .npy array; empty arrays cannot be mapped and are saved"""
+    filename = os.path.join(path, name + ".npy")
+    if not length:
+        np.save(filename, np.zeros(0, dtype=dtype))
+        return np.zeros(0, dtype=dtype)
+    return np.lib.format.open_memmap(filename, mode="w+", dtype=dtype, shape=(length,))
+
+
+def _load(path: str) -> np.ndarray:
+    """Memory-map a .npy array read-only; empty arrays cannot be mapped and are loaded"""
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        return np.load(path)
+
+
+class _Segment:
+    """One immutable on-disk segment, memory-mapped
+
+    Postings are grouped by term: the postings of ``terms[i]`` are
+    ``docs[offsets[i]:offsets[i + 1]]`` (segment-local doc numbers, ascending)
+    with matching ``freqs``.
+    """
+
+    FILES = ("terms", "offsets", "docs", "freqs", "lengths", "text_offsets", "text")
+
+    def __init__(self, path: str, base: int):
+        self.path = path
+        self.base = base  # global id of the segment's first document
+        for name in self.FILES:
+            setattr(self, name, _load(os.path.join(path, name + ".npy")))
+        self.num_docs = len(self.lengths)
+        self.total_length = int(self.lengths.sum(dtype=np.int64))
+
+    @classmethod
+    def write(cls, path: str, terms: np.ndarray, docs: np.ndarray, freqs: np.ndarray,
+              lengths: np.ndarray, text_offsets: np.ndarray, text: np.ndarray):
+        """Write a segment from postings in any order; ``path`` appears atomically
+
+        The arrays go to ``path + ".tmp"`` (which the caller may have created
+        to reserve the name) and the directory is then renamed into place.
+        """
+        order = np.argsort(terms, kind="stable")  # stable keeps docs ascending within a term
+        terms, docs, freqs = terms[order], docs[order], freqs[order]
+        unique_terms, counts = np.unique(terms, return_counts=True)
+        arrays = {
+            "terms": unique_terms.astype(np.int64),
+            "offsets": np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            "docs": docs.astype(np.uint32),
+            "freqs": np.minimum(freqs, np.iinfo(np.uint16).max).astype(np.uint16),
+            "lengths": lengths.astype(np.uint32),
+            "text_offsets": text_offsets.astype(np.int64),
+            "text": text,
+        }
+        tmp_path = path + ".tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, name + ".npy"), array)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def merge(cls, path: str, segments: List["_Segment"]):
+        """Write the union of ``segments`` (in order) as one segment; ``path`` appears atomically
+
+        A k-way merge over the sorted term tables: outputs are memory-mapped
+        and filled a block of terms at a time, so memory stays bounded by
+        ``_MERGE_POSTINGS`` rather than growing with the corpus.
+        """
+        tmp_path = path + ".tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        terms = np.unique(np.concatenate([segment.terms for segment in segments]))
+        positions = [np.searchsorted(terms, segment.terms) for segment in segments]
+        counts = np.zeros(len(terms), dtype=np.int64)
+        for segment, pos in zip(segments, positions):
+            counts[pos] += np.diff(segment.offsets)
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        np.save(os.path.join(tmp_path, "terms.npy"), terms.astype(np.int64))
+        np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+
+        docs = _create(tmp_path, "docs", np.uint32, int(offsets[-1]))
+        freqs = _create(tmp_path, "freqs", np.uint16, int(offsets[-1]))
+        first = 0
+        while first < len(terms):
+            last = int(np.searchsorted(offsets, offsets[first] + _MERGE_POSTINGS, side="right")) - 1
+            last = min(max(last, first + 1), len(terms))
+            keys, block_docs, block_freqs = [], [], []
+            for segment, pos in zip(segments, positions):
+                lo, hi = np.searchsorted(pos, [first, last])
+                if lo == hi:
+                    continue
+                start, end = segment.offsets[lo], segment.offsets[hi]
+                keys.append(np.repeat(pos[lo:hi], np.diff(segment.offsets[lo:hi + 1])))
+                block_docs.append(segment.docs[start:end].astype(np.int64) + segment.base)
+                block_freqs.append(segment.freqs[start:end])
+            # Stable, so each term keeps its postings in segment (and so document) order
+            order = np.argsort(np.concatenate(keys), kind="stable")
+            docs[offsets[first]:offsets[last]] = np.concatenate(block_docs)[order]
+            freqs[offsets[first]:offsets[last]] = np.concatenate(block_freqs)[order]
+            first = last
+
+        num_docs = sum(segment.num_docs for segment in segments)
+        lengths = _create(tmp_path, "lengths", np.uint32, num_docs)
+        text_offsets = _create(tmp_path, "text_offsets", np.int64, num_docs + 1)
+        text = _create(tmp_path, "text", np.uint8, sum(len(segment.text) for segment in segments))
+        doc_base = text_base = 0
+        for segment in segments:
+            lengths[doc_base:doc_base + segment.num_docs] = segment.lengths
+            text_offsets[doc_base:doc_base + segment.num_docs] = segment.text_offsets[:-1] + text_base
+            for start in range(0, len(segment.text), _COPY_BYTES):
+                chunk = segment.text[start:start + _COPY_BYTES]
+                text[text_base + start:text_base + start + len(chunk)] = chunk
+            doc_base += segment.num_docs
+            text_base += len(segment.text)
+        text_offsets[num_docs] = text_base
+
+        for array in (docs, freqs, lengths, text_offsets, text):
+            if isinstance(array, np.memmap):
+                array.flush()
+        del docs, freqs, lengths, text_offsets, text
+        os.replace(tmp_path, path)
+
+    def lookup(self, terms: np.ndarray):
+        """Postings ranges of ``terms``; absent terms get an empty range"""
+        if not len(self.terms):
+            empty = np.zeros(len(terms), dtype=np.int64)
+            return empty, empty
+        pos = np.minimum(np.searchsorted(self.terms, terms), len(self.terms) - 1)
+        found = self.terms[pos] == terms
+        starts = np.where(found, self.offsets[pos], 0)
+        ends = np.where(found, self.offsets[pos + 1], 0)
+        return starts, ends
+
+    def document(self, doc: int) -> bytes:
+        return self.text[self.text_offsets[doc]:self.text_offsets[doc + 1]].tobytes()
+
+
+class BM25Index:
+    """Local BM25 retrieval over a directory of memory-mapped segments
+
+    ``add_documents`` buffers text and writes a new immutable segment once
+    ``segment_bytes`` of text are pending (or on ``flush``); documents become
+    searchable when their segment is written. Several writers, in this or
+    other processes, may add to one directory: each write re-reads the
+    manifest under a lock on the directory and claims a fresh segment name.
+    ``merge`` streams all segments into one. Segments are plain ``.npy`` files opened with ``mmap_mode``,
+    so opening an index copies nothing and processes searching the same
+    index share its pages. ``manifest.json`` lists the live segments and is
+    replaced atomically; ``search`` checks it and reloads when another
+    process (such as ``python -m agent_a.retrieval DIR --add``) has written
+    or merged segments. Terms are feature-hashed with the query analysis tokenizer.
+    """
+
+    def __init__(self, path: str, n_features: int = DEFAULT_FEATURES, k1: float = 1.2,
+                 b: float = 0.75, segment_bytes: int = 32 << 20):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.segment_bytes = segment_bytes
+        self.n_features = n_features
+        self._lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._next_segment = 1
+        self._segments: List[_Segment] = []
+        self._manifest_stamp = None  # (inode, mtime, size) of the manifest last loaded or written
+        os.makedirs(path, exist_ok=True)
+        self.reload()
+
+    def __len__(self) -> int:
+        segments = self._segments
+        return segments[-1].base + segments[-1].num_docs if segments else 0
+
+    def _stamp(self):
+        try:
+            st = os.stat(os.path.join(self.path, MANIFEST))
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def reload(self) -> None:
+        """(Re)open the segments listed in the manifest"""
+        manifest_path = os.path.join(self.path, MANIFEST)
+        stamp = self._stamp()
+        if stamp is None:
+            return
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.n_features = manifest["n_features"]
+        self._next_segment = manifest["next_segment"]
+        segments, base = [], 0
+        for name in manifest["segments"]:
+            segment = _Segment(os.path.join(self.path, name), base)
+            segments.append(segment)
+            base += segment.num_docs
+        self._segments = segments
+        self._manifest_stamp = stamp
+
+    def _refresh(self) -> None:
+        """Reload if the manifest changed since it was last loaded or written"""
+        # The manifest is replaced, never rewritten in place, so a new inode marks every change
+        if self._stamp() == self._manifest_stamp or not self._lock.acquire(blocking=False):
+            return  # Unchanged, or a write of our own is in progress; check again next search
+        try:
+            self.reload()
+        except (OSError, ValueError) as e:
+            # A merge elsewhere can delete segments between writing the manifest and our read
+            self.logger.debug("Index reload deferred: %s", e)
+        finally:
+            self._lock.release()
+
+    @contextlib.contextmanager
+    def _manifest_lock(self):
+        """Serialize manifest updates with other writers of this directory, in any process"""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # Releases the lock
+
+    def _reserve_segment(self) -> str:
+        """Claim an unused segment name by creating its .tmp directory (manifest lock held)"""
+        taken = [int(entry[4:10]) for entry in os.listdir(self.path)
+                 if entry.startswith("seg_") and entry[4:10].isdigit()]
+        number = max([self._next_segment - 1] + taken) + 1
+        while True:
+            name = f"seg_{number:06d}"
+            try:
+                os.mkdir(os.path.join(self.path, name + ".tmp"))
+            except FileExistsError:
+                number += 1
+                continue
+            self._next_segment = number + 1
+            return name
+
+    def _write_segment(self, write: Callable[[str], None], base: int, names: List[str]) -> _Segment:
+        """Write a segment and publish it after ``names`` in the manifest (manifest lock held)
+
+        If any step fails, the partial segment is removed and the manifest is unchanged.
+        """
+        name = self._reserve_segment()
+        path = os.path.join(self.path, name)
+        try:
+            write(path)
+            segment = _Segment(path, base)
+            self._write_manifest(names + [name])
+        except BaseException:
+            shutil.rmtree(path + ".tmp", ignore_errors=True)
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+        return segment
+
+    def _write_manifest(self, names: List[str]) -> None:
+        manifest = {"n_features": self.n_features, "next_segment": self._next_segment,
+                    "segments": names}
+        tmp_path = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST))
+        self._manifest_stamp = self._stamp()
+
+    def add_documents(self, texts: Iterable[str]) -> List[int]:
+        """Queue documents for indexing; returns their document ids"""
+        with self._lock:
+            first = len(self) + len(self._pending)
+            for text in texts:
+                encoded = text.encode("utf-8")
+                self._pending.append(encoded)
+                self._pending_bytes += len(encoded)
+                if self._pending_bytes >= self.segment_bytes:
+                    self._flush_locked()
+            return list(range(first, len(self) + len(self._pending)))
+
+    def flush(self) -> None:
+        """Write pending documents as a new segment"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        # Pending documents are only dropped once their segment is published
+        texts = self._pending
+        if not texts:
+            return
+
+        terms, docs, freqs, lengths = [], [], [], []
+        # Chunked by bytes: the tokenizer's scratch arrays grow with the chunk's text
+        for first, last in _byte_chunks(texts, _TOKENIZE_BYTES):
+            chunk = texts[first:last]
+            features, owners = hash_tokens(chunk, self.n_features)
+            lengths.append(np.bincount(owners, minlength=len(chunk)))
+            # One posting per distinct (document, term) pair
+            keys, counts = np.unique((owners + first) * self.n_features + features, return_counts=True)
+            docs.append(keys // self.n_features)
+            terms.append(keys % self.n_features)
+            freqs.append(counts)
+
+        text_lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        write = lambda path: _Segment.write(
+            path, np.concatenate(terms), np.concatenate(docs), np.concatenate(freqs),
+            np.concatenate(lengths), np.concatenate(([0], np.cumsum(text_lengths))),
+            np.frombuffer(b"".join(texts), dtype=np.uint8))
+        with self._manifest_lock():
+            self.reload()  # Other writers may have added segments since we last looked
+            names = [os.path.basename(s.path) for s in self._segments]
+            segment = self._write_segment(write, len(self), names)
+            self._segments = self._segments + [segment]
+        self._pending, self._pending_bytes = [], 0
+        self.logger.debug("Wrote segment %s with %d documents", os.path.basename(segment.path), segment.num_docs)
+
+    def merge(self) -> None:
+        """Fold all segments into one, keeping document ids"""
+        with self._lock:
+            self._flush_locked()
+            with self._manifest_lock():
+                self._merge_locked()
+
+    def _merge_locked(self) -> None:
+        """Merge the segments currently in the manifest (both locks held)"""
+        self.reload()
+        old = self._segments
+        if len(old) < 2:
+            return
+        write = lambda path: _Segment.merge(path, old)
+        segment = self._write_segment(write, 0, [])
+        name = os.path.basename(segment.path)
+        self._segments = [segment]
+        # Readers that still map the old files keep them until they let go
+        for stale in old:
+            shutil.rmtree(stale.path, ignore_errors=True)
+        self.logger.info("Merged %d segments into %s", len(old), name)
+
+    def search(self, query: str, k: int = 5, snippet_chars: int = 300) -> List[Dict[str, Any]]:
+        """Top ``k`` documents for ``query`` by BM25 score, best first"""
+        self._refresh()
+        segments = self._segments
+        num_docs = sum(segment.num_docs for segment in segments)
+        if not num_docs or k <= 0:
+            return []
+        features, _ = hash_tokens([query], self.n_features)
+        terms, query_freqs = np.unique(features, return_counts=True)
+        if not len(terms):
+            return []
+
+        ranges = [segment.lookup(terms) for segment in segments]
+        doc_freqs = sum(ends - starts for starts, ends in ranges)
+        idf = np.log1p((num_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)) * query_freqs
+        avg_length = max(sum(segment.total_length for segment in segments) / num_docs, 1.0)
+
+        candidates = []
+        for segment, (starts, ends) in zip(segments, ranges):
+            hits = np.flatnonzero(ends > starts)
+            if not len(hits):
+                continue
+            docs = np.concatenate([segment.docs[starts[i]:ends[i]] for i in hits])
+            freqs = np.concatenate([segment.freqs[starts[i]:ends[i]] for i in hits]).astype(np.float64)
+            weights = np.repeat(idf[hits], (ends - starts)[hits])
+            norms = self.k1 * (1 - self.b + self.b * segment.lengths[docs] / avg_length)
+            scores = weights * freqs * (self.k1 + 1) / (freqs + norms)
+
+            # Sum per document: dense when the postings cover much of the segment
+            if len(docs) * 8 >= segment.num_docs:
+                totals = np.bincount(docs, weights=scores, minlength=segment.num_docs)
+                unique_docs = np.flatnonzero(totals)
+                totals = totals[unique_docs]
+            else:
+                unique_docs, inverse = np.unique(docs, return_inverse=True)
+                totals = np.bincount(inverse, weights=scores)
+            if len(unique_docs) > k:
+                best = np.argpartition(-totals, k - 1)[:k]
+                unique_docs, totals = unique_docs[best], totals[best]
+            candidates.extend((float(score), segment, int(doc)) for doc, score in zip(unique_docs, totals))
+
+        candidates.sort(key=lambda c: (-c[0], c[1].base + c[2]))
+        return [
+            {
+                "doc_id": segment.base + doc,
+                "score": score,
+                "text": segment.document(doc).decode("utf-8", "replace")[:snippet_chars],
+            }
+            for score, segment, doc in candidates[:k]
+        ]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build or query a local BM25 index")
+    parser.add_argument("index", help="Index directory")
+    parser.add_argument("--add", metavar="FILE", nargs="+", default=[],
+                        help="Index FILE, one document per line")
+    parser.add_argument("--merge", action="store_true", help="Merge all segments into one")
+    parser.add_argument("--query", help="Print the top results for QUERY")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    index = BM25Index(args.index)
+    for filename in args.add:
+        with open(filename, "r", encoding="utf-8") as f:
+            index.add_documents(line.rstrip("\n") for line in f)
+    index.flush()
+    if args.merge:
+        index.merge()
+    if args.query:
+        for hit in index.search(args.query, k=args.k):
+            print(f"{hit['doc_id']}\t{hit['score']:.3f}\t{hit['text'][:80]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from .decision_maker import TERMINAL_STATUSES, DecisionMaker, Task, TaskStatus
+
+
+class TaskWatcher:
+    """Bridge DecisionMaker task completions onto an asyncio event loop"""
+
+    def __init__(self, decision_maker: DecisionMaker, loop: asyncio.AbstractEventLoop):
+        self.decision_maker = decision_maker
+        self.loop = loop
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        decision_maker.add_listener(self._on_task_finished)
+
+    def close(self):
+        """Stop receiving task notifications"""
+        self.decision_maker.remove_listener(self._on_task_finished)
+
+    def _on_task_finished(self, task: Task):
+        # Runs on DecisionMaker threads; hop onto the loop before touching futures
+        try:
+            self.loop.call_soon_threadsafe(self._resolve, task)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    def _resolve(self, task: Task):
+        for future in self._waiters.pop(task.id, ()):
+            if not future.done():
+                future.set_result(task)
+
+    def wait(self, task_id: str) -> asyncio.Future:
+        """Return a future resolved with the task once it completes or fails"""
+        future = self.loop.create_future()
+        task = self.decision_maker.active_tasks.get(task_id)
+        if task is None:
+            future.set_exception(KeyError(f"Unknown task: {task_id}"))
+        elif task.status in TERMINAL_STATUSES:
+            future.set_result(task)
+        else:
+            self._waiters.setdefault(task_id, []).append(future)
+        return future
+
+    async def as_completed(self, task_ids: Iterable[str]) -> AsyncIterator[Task]:
+        """Yield tasks in the order they reach a terminal state"""
+        for future in asyncio.as_completed([self.wait(task_id) for task_id in task_ids]):
+            yield await future
+
+
+class _Connection:
+    """Per-client state: serialized writes and a bounded set of in-flight requests"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 max_pipeline: int):
+        self.reader = reader
+        self.writer = writer
+        self.slots = asyncio.Semaphore(max_pipeline)
+        self.inflight: Set[asyncio.Task] = set()
+        self.reader_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._next_id = 0
+
+    def next_request_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    async def send(self, message: Dict[str, Any]):
+        data = json.dumps(message, default=repr).encode() + b"\n"
+        async with self._write_lock:
+            if self.writer.is_closing():
+                return
+            self.writer.write(data)
+            await self.writer.drain()
+
+
+class AgentServer:
+    """Asyncio front end multiplexing many clients onto one AgentA pipeline
+
+    The protocol is newline-delimited JSON. A client sends
+    ``{"id": ..., "command": "..."}`` (or a bare line of text) and may pipeline
+    further requests without waiting. Every request is answered with an
+    ``accepted`` event listing its task IDs, one ``step`` event per task as it
+    finishes and a final ``done`` (or ``error``) event, all tagged with the
+    request ID.
+    """
+
+    def __init__(self, agent, host: str = "127.0.0.1", port: int = 8765,
+                 path: Optional[str] = None, max_connections: int = 64,
+                 max_pipeline: int = 32, drain_timeout: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.agent = agent
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_connections = max_connections
+        self.max_pipeline = max_pipeline
+        self.drain_timeout = drain_timeout
+        self.draining = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.watcher: Optional[TaskWatcher] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[_Connection] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self._closed: Optional[asyncio.Event] = None
+
+    @property
+    def address(self):
+        """Address the server is bound to (useful with port 0)"""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()
+
+    async def start(self):
+        """Bind the listening socket and start accepting clients"""
+        self.loop = asyncio.get_running_loop()
+        self.watcher = TaskWatcher(self.agent.decision_maker, self.loop)
+        self._closed = asyncio.Event()
+        if self.path:
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+            self.logger.info("AgentServer listening on %s", self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            self.logger.info("AgentServer listening on %s", self.address)
+
+    async def serve_forever(self):
+        """Start the server and block until it has been drained"""
+        await self.start()
+        await self._closed.wait()
+
+    def request_drain(self):
+        """Schedule a graceful drain; safe to call from signal handlers and other threads"""
+        if self.loop is None or self.draining:
+            return
+        self.loop.call_soon_threadsafe(lambda: asyncio.ensure_future(self.drain()))
+
+    async def drain(self):
+        """Stop accepting work, let in-flight requests finish, then close"""
+        if self.draining:
+            return
+        self.draining = True
+        self.logger.info("Draining %d connection(s)", len(self._connections))
+        self._server.close()
+        await self._server.wait_closed()
+
+        # Stop reading new requests; already accepted ones keep running
+        for conn in list(self._connections):
+            if conn.reader_task is not None:
+                conn.reader_task.cancel()
+
+        if self._handlers:
+            _, pending = await asyncio.wait(list(self._handlers), timeout=self.drain_timeout)
+            if pending:
+                self.logger.warning("Drain deadline hit, aborting %d connection(s)", len(pending))
+                for conn in list(self._connections):
+                    for request in list(conn.inflight):
+                        request.cancel()
+                    conn.writer.close()
+                await asyncio.wait(pending, timeout=1.0)
+
+        self.watcher.close()
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+        self.logger.info("AgentServer drained")
+        self._closed.set()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = _Connection(reader, writer, self.max_pipeline)
+        if self.draining or len(self._connections) >= self.max_connections:
+            await conn.send({"event": "error", "error": "server busy"})
+            writer.close()
+            return
+
+        handler = asyncio.current_task()
+        self._connections.add(conn)
+        self._handlers.add(handler)
+        try:
+            conn.reader_task = asyncio.ensure_future(self._read_requests(conn))
+            try:
+                await conn.reader_task
+            except asyncio.CancelledError:
+                if not conn.reader_task.cancelled():
+                    raise
+            # Client finished sending (or we are draining): flush outstanding replies
+            if conn.inflight:
+                await asyncio.gather(*conn.inflight, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.logger.debug("Client connection lost: %s", e)
+        finally:
+            self._connections.discard(conn)
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _read_requests(self, conn: _Connection):
+        while not self.draining:
+            line = await conn.reader.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+
+            request_id, command = self._parse_request(conn, line)
+            if command is None:
+                await conn.send({"id": request_id, "event": "error", "error": "missing command"})
+                continue
+
+            # Bounded pipelining: stop reading once the client has too much in flight
+            await conn.slots.acquire()
+            request = asyncio.ensure_future(self._handle_request(conn, request_id, command))
+            conn.inflight.add(request)
+            request.add_done_callback(lambda r, c=conn: (c.inflight.discard(r), c.slots.release()))
+
+    def _parse_request(self, conn: _Connection, line: bytes):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            message = None
+        if isinstance(message, dict):
+            return message.get("id", conn.next_request_id()), message.get("command")
+        return conn.next_request_id(), line.decode(errors="replace")
+
+    async def _handle_request(self, conn: _Connection, request_id: Any, command: str):
+        task_ids: List[str] = []
+        try:
+            task_ids = await self.loop.run_in_executor(None, self.agent.submit_command, command)
+            await conn.send({"id": request_id, "event": "accepted", "task_ids": task_ids})
+
+            results = []
+            async for task in self.watcher.as_completed(task_ids):
+                event = {"id": request_id, "event": "step", "task_id": task.id,
+                         "status": task.status.name}
+                if task.status == TaskStatus.COMPLETED:
+                    event["result"] = task.result
+                    results.append(task.result)
+                else:
+                    event["error"] = str(task.error)
+                await conn.send(event)
+
+            await conn.send({"id": request_id, "event": "done", "results": results})
+        except asyncio.CancelledError:
+            raise
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.logger.error("Request %s failed: %s", request_id, e)
+            await conn.send({"id": request_id, "event": "error", "error": str(e)})
+        finally:
+            if task_ids:
+                self._forget(task_ids)
+
+    def _forget(self, task_ids: List[str]):
+        """Drop a request's tasks from the DecisionMaker once all of them have finished"""
+        decision_maker = self.agent.decision_maker
+        unfinished = [task_id for task_id in task_ids
+                      if decision_maker.get_task_status(task_id) not in TERMINAL_STATUSES + (None,)]
+        if not unfinished:
+            decision_maker.forget(task_ids)
+            return
+
+        # The client went away mid-request; forget once the rest finishes
+        async def forget_later():
+            async for _ in self.watcher.as_completed(unfinished):
+                pass
+            decision_maker.forget(task_ids)
+
+        asyncio.ensure_future(forget_later())
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run Agent-A as a headless multi-client server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-connections", type=int, default=64)
+    parser.add_argument("--max-pipeline", type=int, default=32,
+                        help="Maximum in-flight requests per connection")
+    parser.add_argument("--drain-timeout", type=float, default=30.0,
+                        help="Seconds to wait for in-flight requests on SIGTERM")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Run the DecisionMaker across this many worker processes")
+    parser.add_argument("--journal", metavar="PATH",
+                        help="Journal tasks to PATH and resume unfinished plans on restart")
+    parser.add_argument("--index", metavar="DIR",
+                        help="BM25 index (see agent_a.retrieval) searched by the gather_context step")
+    parser.add_argument("--log-mode", choices=["debug", "async", "production"], default="debug")
+    args = parser.parse_args(argv)
+    if args.journal and args.workers:
+        parser.error("--journal is not supported with --workers")
+
+    from .core import AgentA
+
+    AgentA(cluster_workers=args.workers, journal_path=args.journal,
+           log_mode=args.log_mode, index_path=args.index).serve(
+        host=args.host,
+        port=args.port,
+        path=args.unix,
+        max_connections=args.max_connections,
+        max_pipeline=args.max_pipeline,
+        drain_timeout=args.drain_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+import argparse
+import heapq
+import itertools
+import math
+import random
+import time
+from array import array
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .decision_maker import DecisionMaker, Task, TaskStatus
+from .journal import TaskJournal
+from .logging_setup import configure_logging
+
+# A duration distribution draws seconds from the simulation's random generator
+Distribution = Callable[[random.Random], float]
+
+
+def constant(seconds: float) -> Distribution:
+    return lambda rng: seconds
+
+
+def exponential(mean: float) -> Distribution:
+    return lambda rng: rng.expovariate(1.0 / mean)
+
+
+def lognormal(median: float, sigma: float) -> Distribution:
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+def parse_distribution(spec: str) -> Distribution:
+    """Parse ``constant:S``, ``exponential:MEAN`` or ``lognormal:MEDIAN:SIGMA``"""
+    name, *args = spec.split(":")
+    factories = {"constant": constant, "exponential": exponential, "lognormal": lognormal}
+    if name not in factories:
+        raise ValueError(f"Unknown distribution: {name}")
+    return factories[name](*map(float, args))
+
+
+class VirtualClock:
+    """Clock that only moves when the simulation advances it"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SimulatedWork:
+    """Task callable standing in for work that takes ``duration`` virtual seconds"""
+
+    def __init__(self, duration: float):
+        self.duration = duration
+
+    def __call__(self, context: Dict[str, Any]) -> None:
+        return None
+
+
+class _SimulatedFuture:
+    """The part of the Future API DecisionMaker uses, without a Condition per call
+
+    The call is already running when it is submitted, so it cannot be
+    cancelled. Everything happens on the simulation thread, so callbacks
+    run inline and nothing needs a lock.
+    """
+
+    __slots__ = ("_done", "_result", "_error", "_callbacks")
+
+    def __init__(self):
+        self._done = False
+        self._result = None
+        self._error: Optional[BaseException] = None
+        self._callbacks: List[Callable[["_SimulatedFuture"], None]] = []
+
+    def cancel(self) -> bool:
+        return False
+
+    def cancelled(self) -> bool:
+        return False
+
+    def done(self) -> bool:
+        return self._done
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        return self._error
+
+    def add_done_callback(self, fn: Callable[["_SimulatedFuture"], None]) -> None:
+        if self._done:
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+
+    def _finish(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        self._done, self._result, self._error = True, result, error
+        callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+class SimulatedExecutor(Executor):
+    """Executor whose calls finish after a virtual duration
+
+    The duration is the callable's ``duration`` attribute, or a draw from
+    the simulation's distribution. The call itself runs at its completion
+    time, on the simulation thread. Like a thread pool, a started call cannot
+    be cancelled: a timed-out task keeps its worker slot until it finishes.
+    """
+
+    def __init__(self, simulation: "Simulation"):
+        self.simulation = simulation
+
+    def submit(self, fn, *args, **kwargs) -> _SimulatedFuture:
+        sim = self.simulation
+        duration = getattr(fn, "duration", None)
+        if duration is None:
+            duration = sim.duration(sim.rng)
+        future = _SimulatedFuture()
+        now = sim.clock()
+        sim.schedule(now + duration, lambda: self._complete(future, duration, fn, args, kwargs))
+        if duration > sim.decision_maker.task_timeout:
+            sim.schedule(now + sim.decision_maker.task_timeout)  # Wake up to expire it
+        return future
+
+    def _complete(self, future: _SimulatedFuture, duration: float, fn, args, kwargs):
+        self.simulation.busy_time += duration
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            future._finish(error=e)
+        else:
+            future._finish(result)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        pass
+
+
+class _Slots:
+    """Worker slot counter for the single simulation thread, without the cost of a Semaphore"""
+
+    def __init__(self, count: int):
+        self.free = count
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        if not self.free:
+            return False  # Nothing else could release one while we wait
+        self.free -= 1
+        return True
+
+    def release(self) -> None:
+        self.free += 1
+
+
+class _SimulatedDecisionMaker(DecisionMaker):
+    """DecisionMaker that tells the simulation when each task is submitted and starts"""
+
+    def __init__(self, simulation: "Simulation", **kwargs):
+        self.simulation = simulation
+        super().__init__(**kwargs)
+        self._slots = _Slots(self.max_workers)
+
+    def _enqueue(self, task: Task) -> None:
+        self.simulation._submitted.setdefault(task.id, self.clock())
+        super()._enqueue(task)
+
+    def _safe_execute_task(self, task: Task) -> None:
+        self.simulation._started[task.id] = self.clock()
+        super()._safe_execute_task(task)
+
+
+def _percentiles(values: array) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": ordered[-1]}
+
+
+@dataclass
+class SimulationReport:
+    """Outcome of a simulation run; times are virtual seconds unless noted"""
+    virtual_seconds: float
+    wall_seconds: float
+    submitted: int
+    completed: int
+    failed: int
+    timed_out: int
+    latency: Dict[str, float]  # submission to finish
+    wait: Dict[str, float]     # submission to start
+    utilization: float         # busy worker time / (max_workers * virtual_seconds)
+    queue_depth: List[Tuple[float, int, int]] = field(default_factory=list)  # (time, queued, running)
+
+    def summary(self) -> str:
+        fmt = lambda d: ", ".join(f"{k} {v:.3f}s" for k, v in d.items())
+        peak = max((queued for _, queued, _ in self.queue_depth), default=0)
+        return "\n".join([
+            f"simulated {self.virtual_seconds / 3600:.2f} h in {self.wall_seconds:.2f} s wall "
+            f"({self.virtual_seconds / max(self.wall_seconds, 1e-9):.0f}x)",
+            f"tasks: {self.submitted} submitted, {self.completed} completed, "
+            f"{self.failed} failed ({self.timed_out} timed out)",
+            f"latency: {fmt(self.latency)}",
+            f"wait:    {fmt(self.wait)}",
+            f"worker utilization: {self.utilization:.1%}, peak queue depth {peak}",
+        ])
+
+
+class Simulation:
+    """Deterministic discrete-event run of a DecisionMaker on a virtual clock
+
+    The DecisionMaker is the real one, with its clock replaced by a
+    ``VirtualClock`` and its executor by a ``SimulatedExecutor``. Dispatch
+    order, priorities, dependency parking and timeouts therefore run through
+    the same code as in production. Only time is simulated: an event loop
+    jumps from one arrival or completion to the next, so a day of traffic
+    replays in seconds and the same seed gives the same result.
+
+    Tasks may also be submitted to ``decision_maker`` directly; ``run`` then
+    executes them from the current virtual time. Unit tests use this with
+    ``forget_finished=False``, which keeps finished tasks inspectable.
+    """
+
+    def __init__(self, max_workers: int = 4, task_timeout: float = 60,
+                 duration: Distribution = exponential(1.0), seed: int = 0,
+                 sample_interval: float = 60.0, forget_finished: bool = True,
+                 journal: Optional[TaskJournal] = None):
+        self.clock = VirtualClock()
+        self.rng = random.Random(seed)
+        self.duration = duration
+        self.sample_interval = sample_interval
+        self.forget_finished = forget_finished  # Keeps memory flat over long runs
+        self.busy_time = 0.0
+        self._submitted: Dict[str, float] = {}  # Filled in by the decision maker, even during journal replay
+        self._started: Dict[str, float] = {}
+        self.decision_maker = _SimulatedDecisionMaker(
+            self, max_workers=max_workers, task_timeout=task_timeout, journal=journal,
+            query_batch_window=None, clock=self.clock, executor=SimulatedExecutor(self)
+        )
+        self.decision_maker.add_listener(self._on_finished)
+        self._events: List[tuple] = []  # (time, seq, callback)
+        self._seq = itertools.count()
+        self._plan_remaining: Dict[str, int] = {}
+        self._latencies = array("d")
+        self._waits = array("d")
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "timed_out": 0}
+        self._depth: List[Tuple[float, int, int]] = []
+        self._next_sample = 0.0
+
+    def schedule(self, at: float, callback: Optional[Callable[[], None]] = None) -> None:
+        """Run ``callback`` (or just wake the dispatcher) at virtual time ``at``"""
+        heapq.heappush(self._events, (at, next(self._seq), callback))
+
+    def add_task(self, at: float, priority: int = 0, duration: Optional[float] = None) -> None:
+        """Submit a standalone task at ``at``; its duration is drawn if not given"""
+        self.schedule(at, lambda: self._submit_task(priority, duration))
+
+    def add_plan(self, at: float, query: str = "simulated query") -> None:
+        """Submit a reasoning plan at ``at``; each step's duration is drawn"""
+        self.schedule(at, lambda: self._submit_plan(query))
+
+    def poisson_arrivals(self, rate_per_hour: float, hours: float, priorities: Sequence[int] = (0,),
+                         plans: bool = False, start: float = 0.0) -> None:
+        """Submit tasks (or plans) as a Poisson process between ``start`` and ``start + hours``"""
+        rate = rate_per_hour / 3600.0
+        end = start + hours * 3600.0
+
+        def arrive():
+            if plans:
+                self._submit_plan("simulated query")
+            else:
+                self._submit_task(self.rng.choice(priorities), None)
+            # Arrivals are generated one at a time, so the event heap stays small
+            upcoming = self.clock() + self.rng.expovariate(rate)
+            if upcoming < end:
+                self.schedule(upcoming, arrive)
+
+        first = start + self.rng.expovariate(rate)
+        if first < end:
+            self.schedule(first, arrive)
+
+    def _submit_task(self, priority: int, duration: Optional[float]) -> None:
+        if duration is None:
+            duration = self.duration(self.rng)
+        self.decision_maker.add_task(SimulatedWork(duration), priority=priority)
+        self._counts["submitted"] += 1
+
+    def _submit_plan(self, query: str) -> None:
+        task_ids = self.decision_maker.create_reasoning_plan(query)
+        self._plan_remaining[task_ids[0]] = len(task_ids)
+        self._counts["submitted"] += len(task_ids)
+
+    def _on_finished(self, task: Task) -> None:
+        now = self.clock()
+        submitted = self._submitted.pop(task.id, now)
+        started = self._started.pop(task.id, None)
+        self._latencies.append(now - submitted)
+        if started is not None:
+            self._waits.append(started - submitted)
+        if task.status == TaskStatus.COMPLETED:
+            self._counts["completed"] += 1
+        else:
+            self._counts["failed"] += 1
+            if isinstance(task.error, TimeoutError):
+                self._counts["timed_out"] += 1
+
+        # Forget finished work; plans go once every step has finished
+        if not self.forget_finished:
+            return
+        if task.plan_id is None:
+            self.decision_maker.forget([task.id])
+        elif task.plan_id in self._plan_remaining:
+            self._plan_remaining[task.plan_id] -= 1
+            if not self._plan_remaining[task.plan_id]:
+                del self._plan_remaining[task.plan_id]
+                _, task_ids = self.decision_maker._plans[task.plan_id]
+                self.decision_maker.forget(task_ids)
+
+    def _sample(self, until: float) -> None:
+        """Record queue depth at each sample point before ``until`` (depth only changes at events)"""
+        if self._next_sample >= until:
+            return
+        decision_maker = self.decision_maker
+        queued = len(decision_maker.task_queue) + sum(map(len, decision_maker._waiting.values()))
+        running = len(decision_maker._running)
+        while self._next_sample < until:
+            self._depth.append((self._next_sample, queued, running))
+            self._next_sample += self.sample_interval
+
+    def run(self, until: Optional[float] = None) -> SimulationReport:
+        """Process events until none are left (or until virtual time ``until``)"""
+        wall_start = time.perf_counter()
+        events = self._events
+        self.decision_maker.dispatch_ready()  # Tasks submitted directly before the run
+        while events:
+            at = events[0][0]
+            if until is not None and at > until:
+                break
+            self._sample(at)
+            self.clock.now = at
+            # Everything due at this instant lands before the dispatcher runs
+            while events and events[0][0] == at:
+                callback = heapq.heappop(events)[2]
+                if callback is not None:
+                    callback()
+            self.decision_maker.dispatch_ready()
+        if until is not None:
+            self._sample(until)
+            self.clock.now = max(self.clock.now, until)
+        return self.report(time.perf_counter() - wall_start)
+
+    def report(self, wall_seconds: float = 0.0) -> SimulationReport:
+        elapsed = self.clock()
+        capacity = self.decision_maker.max_workers * elapsed
+        return SimulationReport(
+            virtual_seconds=elapsed,
+            wall_seconds=wall_seconds,
+            latency=_percentiles(self._latencies),
+            wait=_percentiles(self._waits),
+            utilization=self.busy_time / capacity if capacity else 0.0,
+            queue_depth=list(self._depth),
+            **self._counts,
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay DecisionMaker load on a virtual clock")
+    parser.add_argument("--rate", type=float, default=100_000, help="Arrivals per hour")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--duration", default="lognormal:0.1:1.0",
+                        help="constant:S, exponential:MEAN or lognormal:MEDIAN:SIGMA (seconds)")
+    parser.add_argument("--priorities", type=int, nargs="+", default=[0])
+    parser.add_argument("--plans", action="store_true", help="Arrivals are 4-step reasoning plans")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-interval", type=float, default=3600,
+                        help="Virtual seconds between queue depth samples")
+    args = parser.parse_args(argv)
+
+    # Rate limited, so a run with many timeouts does not flood the terminal
+    configure_logging("production")
+    simulation = Simulation(max_workers=args.workers, task_timeout=args.timeout,
+                            duration=parse_distribution(args.duration), seed=args.seed,
+                            sample_interval=args.sample_interval)
+    simulation.poisson_arrivals(args.rate, args.hours, priorities=args.priorities, plans=args.plans)
+    report = simulation.run()
+    print(report.summary())
+    print("queue depth (time h, queued, running):")
+    for at, queued, running in report.queue_depth:
+        print(f"  {at / 3600:6.2f} {queued:8d} {running:4d}")
+
+
+if __name__ == "__main__":
+    main()
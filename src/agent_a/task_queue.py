@@ -0,0 +1,122 @@
+import heapq
+import itertools
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+class IndexedPriorityQueue:
+    """Thread-safe priority queue of tasks keyed by task id
+
+    Highest priority first, FIFO among equal priorities (a task keeps its
+    arrival order when reprioritized). Heap entries are indexed by task id,
+    so ``cancel`` and ``reprioritize`` never search the heap. An entry that
+    is no longer the indexed one for its task is stale and is skipped when
+    it reaches the top. The heap is
+    rebuilt once removed entries outnumber live ones, so ``put``, ``get``
+    and ``reprioritize`` stay O(log n) amortized and ``cancel`` is O(1).
+    ``get``/``get_nowait``/``empty`` follow ``queue.PriorityQueue``.
+    """
+
+    def __init__(self):
+        self._heap: List[tuple] = []          # (-priority, seq, task id, item)
+        self._entries: Dict[str, tuple] = {}  # task id -> live heap entry
+        self._seq = itertools.count()
+        self._removed = 0
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._entries
+
+    def qsize(self) -> int:
+        return len(self._entries)
+
+    def empty(self) -> bool:
+        return not self._entries
+
+    def put(self, task_id: str, item: Any, priority: int = 0) -> None:
+        """Queue ``item`` under ``task_id``, replacing any entry it already has"""
+        with self._cond:
+            if task_id in self._entries:
+                self._remove(task_id)
+            entry = (-priority, next(self._seq), task_id, item)
+            self._entries[task_id] = entry
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Remove and return the highest-priority item; raises queue.Empty on timeout"""
+        with self._cond:
+            if not self._entries:
+                if not block or not self._cond.wait_for(self.__len__, timeout):
+                    raise queue.Empty
+            heap, entries = self._heap, self._entries
+            while True:
+                entry = heapq.heappop(heap)
+                if entries.get(entry[2]) is not entry:
+                    self._removed -= 1
+                    continue
+                del entries[entry[2]]
+                return entry[3]
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def cancel(self, task_id: str) -> Optional[Any]:
+        """Remove a pending item; returns it, or None if it is not queued"""
+        with self._cond:
+            if task_id not in self._entries:
+                return None
+            return self._remove(task_id)
+
+    def reprioritize(self, task_id: str, priority: int) -> bool:
+        """Change the priority of a pending item; False if it is not queued"""
+        with self._cond:
+            entry = self._entries.get(task_id)
+            if entry is None:
+                return False
+            if entry[0] != -priority:
+                self._remove(task_id)
+                entry = (-priority, entry[1], task_id, entry[3])
+                self._entries[task_id] = entry
+                heapq.heappush(self._heap, entry)
+            return True
+
+    def peek(self) -> Optional[Tuple[str, int, Any]]:
+        """The next ``(task_id, priority, item)`` to be returned by ``get``, without removing it"""
+        with self._cond:
+            while self._heap and self._entries.get(self._heap[0][2]) is not self._heap[0]:
+                heapq.heappop(self._heap)
+                self._removed -= 1
+            if not self._heap:
+                return None
+            priority, _, task_id, item = self._heap[0]
+            return task_id, -priority, item
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Tuple[str, int, Any]]:
+        """Pending ``(task_id, priority, item)`` in dispatch order; the first ``limit`` only if given"""
+        with self._cond:
+            live = list(self._entries.values())
+        entries = heapq.nsmallest(limit, live) if limit is not None else sorted(live)
+        return [(task_id, -priority, item) for priority, _, task_id, item in entries]
+
+    def drain(self) -> List[Any]:
+        """Remove and return every pending item in dispatch order"""
+        with self._cond:
+            live = sorted(self._entries.values())
+            self._heap = []
+            self._entries = {}
+            self._removed = 0
+        return [entry[3] for entry in live]
+
+    def _remove(self, task_id: str) -> Any:
+        entry = self._entries.pop(task_id)
+        self._removed += 1
+        if self._removed > 1024 and self._removed > len(self._entries):
+            entries = self._entries
+            self._heap = [e for e in self._heap if entries.get(e[2]) is e]
+            heapq.heapify(self._heap)
+            self._removed = 0
+        return entry[3]
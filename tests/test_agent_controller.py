@@ -0,0 +1,55 @@
+import asyncio
+import time
+import unittest
+from src.agent_a.core import AgentA
+from src.agent_a.agent_controller import UnifiedAgent
+
+class TestUnifiedAgentBatch(unittest.TestCase):
+    def setUp(self):
+        self.agent = AgentA()
+        self.agent.initialize_components()
+        self.agent.decision_maker.start()
+        self.unified = UnifiedAgent(agent=self.agent)
+
+    def tearDown(self):
+        self.agent.stop()
+
+    def test_process_commands_streams_every_result(self):
+        commands = [f"command {i}" for i in range(20)]
+        results = list(self.unified.process_commands(iter(commands), concurrency=4))
+
+        self.assertEqual(sorted(r.index for r in results), list(range(20)))
+        for result in results:
+            self.assertEqual(result.command, commands[result.index])
+            self.assertIsNone(result.error)
+            self.assertEqual(len(result.results), len(result.task_ids))
+        # Collected tasks are released from the DecisionMaker
+        self.assertEqual(self.agent.decision_maker.active_tasks, {})
+
+    def test_dropped_commands_are_forgotten(self):
+        stream = self.unified.process_commands((f"command {i}" for i in range(50)), concurrency=8)
+        next(stream)
+        stream.close()  # The consumer stops reading with commands still in flight
+        deadline = time.monotonic() + 5
+        while self.agent.decision_maker.active_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.agent.decision_maker.active_tasks, {})
+
+    def test_ordered_results(self):
+        results = list(self.unified.process_commands(
+            (f"command {i}" for i in range(10)), concurrency=3, ordered=True))
+        self.assertEqual([r.index for r in results], list(range(10)))
+
+    def test_async_iterable_input(self):
+        async def commands():
+            for i in range(5):
+                yield f"command {i}"
+
+        async def collect():
+            return [r async for r in self.unified.aprocess_commands(commands(), concurrency=2)]
+
+        results = asyncio.run(collect())
+        self.assertEqual(sorted(r.index for r in results), list(range(5)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import signal
+import time
+import unittest
+from src.agent_a.cluster import ClusterDecisionMaker
+from src.agent_a.decision_maker import TaskStatus
+
+def square(context):
+    return context["value"] ** 2
+
+def worker_pid(context):
+    time.sleep(context.get("delay", 0))
+    return os.getpid()
+
+class TestClusterDecisionMaker(unittest.TestCase):
+    def setUp(self):
+        self.cluster = ClusterDecisionMaker(num_workers=2, heartbeat_interval=0.2)
+        self.cluster.start()
+
+    def tearDown(self):
+        self.cluster.stop()
+
+    def wait_for(self, task_ids, timeout=10):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if all(self.cluster.get_task_status(t) in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+                   for t in task_ids):
+                return
+            time.sleep(0.05)
+        self.fail("Tasks did not finish in time")
+
+    def test_tasks_return_results(self):
+        task_ids = [self.cluster.add_task(square, context={"value": n}) for n in range(10)]
+        self.wait_for(task_ids)
+        self.assertEqual([self.cluster.get_task_result(t) for t in task_ids],
+                         [n ** 2 for n in range(10)])
+
+    def test_unpicklable_task_rejected(self):
+        with self.assertRaises(ValueError):
+            self.cluster.add_task(lambda context: None)
+
+    def test_reasoning_plan(self):
+        task_ids = self.cluster.create_reasoning_plan("test query")
+        self.wait_for(task_ids)
+        self.assertEqual(self.cluster.get_task_result(task_ids[-1]), {'validation_result': True})
+
+    def test_forget_drops_tasks_and_plans(self):
+        task_ids = self.cluster.create_reasoning_plan("test query")
+        task_ids.append(self.cluster.add_task(square, context={"value": 3}))
+        self.wait_for(task_ids)
+        self.cluster.forget(task_ids)
+        self.assertEqual(self.cluster.active_tasks, {})
+        self.assertEqual(self.cluster._plans, {})
+        self.assertEqual(self.cluster._plan_of, {})
+        self.assertEqual(self.cluster._finished_on, {})
+        # Workers keep serving after dropping their copies
+        task_id = self.cluster.add_task(square, context={"value": 4})
+        self.wait_for([task_id])
+        self.assertEqual(self.cluster.get_task_result(task_id), 16)
+
+    def test_dependencies_stay_on_one_worker(self):
+        first = self.cluster.add_task(worker_pid, context={"delay": 0.2})
+        second = self.cluster.add_task(worker_pid, dependencies=[first])
+        self.wait_for([first, second])
+        self.assertEqual(self.cluster.get_task_result(first), self.cluster.get_task_result(second))
+
+    def test_stop_keeps_results_of_running_tasks(self):
+        self.assertTrue(self.cluster.wait_ready(timeout=10))
+        task_id = self.cluster.add_task(worker_pid, context={"delay": 0.5})
+        time.sleep(0.2)  # Let the worker start it
+        self.cluster.stop()
+        self.assertEqual(self.cluster.get_task_status(task_id), TaskStatus.COMPLETED)
+        self.assertIsNotNone(self.cluster.get_task_result(task_id))
+
+    def test_dead_worker_tasks_redispatched(self):
+        task_ids = [self.cluster.add_task(worker_pid, context={"delay": 1}) for _ in range(4)]
+        time.sleep(0.3)
+        victim = self.cluster.worker_status()[0]["pid"]
+        victim_channel = self.cluster._workers[0].results
+        os.kill(victim, signal.SIGKILL)
+        self.wait_for(task_ids, timeout=15)
+        # The replacement reports on a fresh channel; the dead one is closed
+        self.assertIsNot(self.cluster._workers[0].results, victim_channel)
+        self.assertTrue(victim_channel.closed)
+        for task_id in task_ids:
+            self.assertEqual(self.cluster.get_task_status(task_id), TaskStatus.COMPLETED)
+            self.assertNotEqual(self.cluster.get_task_result(task_id), victim)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import logging
 import unittest
 from unittest.mock import patch
 from src.agent_a.core import AgentA
+from src.agent_a.lifecycle import InFlight
 
 class TestAgentA(unittest.TestCase):
     def setUp(self):
@@ -18,6 +20,15 @@ class TestAgentA(unittest.TestCase):
         except Exception as e:
             self.fail(f"AgentA run method raised an exception: {e}")
 
+    def test_journal_rejected_in_cluster_mode(self):
+        with self.assertRaises(ValueError):
+            AgentA(cluster_workers=2, journal_path="tasks.journal")
+
+    def test_default_logging_scoped_to_core(self):
+        package = self.agent.logger.name.rpartition('.')[0]
+        self.assertTrue(self.agent.logger.isEnabledFor(logging.DEBUG))
+        self.assertFalse(logging.getLogger(package + ".decision_maker").isEnabledFor(logging.DEBUG))
+
     def test_register_core_modules(self):
         self.agent.initialize_components()
         self.assertIn("command_processor", self.agent.modularity.modules)
@@ -25,20 +36,33 @@ class TestAgentA(unittest.TestCase):
 
     def test_command_processing(self):
         self.agent.initialize_components()
-        self.agent._command_handler("test_command")
-        task_ids = self.agent.modularity.context.get("task_ids")
+        context = self.agent._command_handler("test_command")
+        task_ids = context.get("task_ids")
         self.assertIsNotNone(task_ids)
         self.assertGreater(len(task_ids), 0)
 
+    def test_command_contexts_are_isolated(self):
+        self.agent.initialize_components()
+        first = self.agent._command_handler("first_command")
+        second = self.agent._command_handler("second_command")
+        self.assertEqual(first.get("current_command"), "first_command")
+        self.assertEqual(second.get("current_command"), "second_command")
+        self.assertNotEqual(first.get("task_ids"), second.get("task_ids"))
+        self.assertIsNone(self.agent.modularity.context.get("task_ids"))
+
     def test_result_handling(self):
         self.agent.initialize_components()
-        self.agent._command_handler("test_command")
+        context = self.agent._command_handler("test_command")
+        results = context.get("results")
+        self.assertEqual(results, [])  # Nothing has run yet
+        # Results are filled in as the plan's tasks complete
+        in_flight = InFlight(self.agent.decision_maker)
+        in_flight.add(context.get("task_ids"))
         self.agent.decision_maker.start()
-        time.sleep(1)  # Allow some time for the tasks to execute
+        self.assertTrue(in_flight.wait_idle(timeout=5))
         self.agent.decision_maker.stop()
-        results = self.agent.modularity.context.get("results")
-        self.assertIsNotNone(results)
-        self.assertGreater(len(results), 0)
+        self.assertEqual(len(results), len(context.get("task_ids")))
+        self.assertEqual(results[-1], {'validation_result': True})
 
 if __name__ == '__main__':
     unittest.main()
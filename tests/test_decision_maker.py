@@ -1,9 +1,12 @@
 import unittest
-from src.agent_a.decision_maker import DecisionMaker, TaskStatus
+from src.agent_a.decision_maker import TaskStatus
+from src.agent_a.simulation import Simulation, SimulatedWork, constant
 
 class TestDecisionMaker(unittest.TestCase):
     def setUp(self):
-        self.decision_maker = DecisionMaker()
+        # The real DecisionMaker on a virtual clock: every task takes 1 simulated second
+        self.simulation = Simulation(duration=constant(1.0), forget_finished=False)
+        self.decision_maker = self.simulation.decision_maker
 
     def test_initialization(self):
         self.assertIsNotNone(self.decision_maker)
@@ -25,9 +28,7 @@ class TestDecisionMaker(unittest.TestCase):
             return "task_result"
 
         task_id = self.decision_maker.add_task(sample_task)
-        self.decision_maker.start()
-        time.sleep(1)  # Allow some time for the task to execute
-        self.decision_maker.stop()
+        self.simulation.run()
         self.assertTrue(self.execution_flag)
         self.assertEqual(self.decision_maker.get_task_status(task_id), TaskStatus.COMPLETED)
         self.assertEqual(self.decision_maker.get_task_result(task_id), "task_result")
@@ -45,10 +46,9 @@ class TestDecisionMaker(unittest.TestCase):
 
         task_a_id = self.decision_maker.add_task(task_a)
         task_b_id = self.decision_maker.add_task(task_b, dependencies=[task_a_id])
-        self.decision_maker.start()
-        time.sleep(2)  # Allow some time for the tasks to execute
-        self.decision_maker.stop()
+        report = self.simulation.run()
         self.assertEqual(self.execution_order, ["A", "B"])
+        self.assertEqual(report.virtual_seconds, 2.0)  # B starts once A has finished
         self.assertEqual(self.decision_maker.get_task_status(task_a_id), TaskStatus.COMPLETED)
         self.assertEqual(self.decision_maker.get_task_status(task_b_id), TaskStatus.COMPLETED)
 
@@ -56,20 +56,67 @@ class TestDecisionMaker(unittest.TestCase):
         def sample_task(context):
             return {"key": "value"}
 
-        task_id = self.decision_maker.add_task(sample_task)
-        self.decision_maker.start()
-        time.sleep(1)  # Allow some time for the task to execute
-        self.decision_maker.stop()
+        self.decision_maker.add_task(sample_task)
+        self.simulation.run()
         self.assertEqual(self.decision_maker.context.get("key"), "value")
 
+    def test_plan_scopes_are_isolated(self):
+        first = self.decision_maker.create_reasoning_plan("first query")
+        second = self.decision_maker.create_reasoning_plan("second query")
+        self.simulation.run()
+        for task_id in first + second:
+            self.assertEqual(self.decision_maker.get_task_status(task_id), TaskStatus.COMPLETED)
+        first_scope = self.decision_maker.active_tasks[first[0]].scope
+        second_scope = self.decision_maker.active_tasks[second[0]].scope
+        self.assertIsNot(first_scope, second_scope)
+        self.assertEqual(first_scope.get("solution"), "proposed_solution")
+        self.assertIsNone(self.decision_maker.context.get("solution"))
+
+    def test_tasks_run_concurrently(self):
+        task_ids = [self.decision_maker.add_task(lambda context: "done") for _ in range(6)]
+        report = self.simulation.run()
+        for task_id in task_ids:
+            self.assertEqual(self.decision_maker.get_task_result(task_id), "done")
+        # Four workers: four tasks run in the first second, the other two in the next
+        self.assertEqual(report.virtual_seconds, 2.0)
+        self.assertEqual(report.wait["max"], 1.0)
+
+    def test_priority_order(self):
+        order = []
+        simulation = Simulation(max_workers=1, duration=constant(1.0), forget_finished=False)
+        for priority in [1, 5, 3]:
+            simulation.decision_maker.add_task(lambda context, p=priority: order.append(p), priority=priority)
+        simulation.run()
+        self.assertEqual(order, [5, 3, 1])  # All queued before the first dispatch, so highest first
+
+    def test_timeout_fails_task_and_dependents(self):
+        simulation = Simulation(task_timeout=5, forget_finished=False)
+        decision_maker = simulation.decision_maker
+        slow = decision_maker.add_task(SimulatedWork(10.0))
+        dependent = decision_maker.add_task(SimulatedWork(1.0), dependencies=[slow])
+        finished = []
+        decision_maker.add_listener(lambda task: finished.append((task.id, simulation.clock())))
+        simulation.run()
+
+        self.assertIsInstance(decision_maker.active_tasks[slow].error, TimeoutError)
+        self.assertEqual(decision_maker.get_task_status(dependent), TaskStatus.FAILED)
+        self.assertEqual(finished, [(slow, 5.0), (dependent, 5.0)])
+
+    def test_failed_dependency_fails_dependents(self):
+        def failing_task(context):
+            raise ValueError("Task failed")
+
+        task_a_id = self.decision_maker.add_task(failing_task)
+        task_b_id = self.decision_maker.add_task(lambda context: "never", dependencies=[task_a_id])
+        self.simulation.run()
+        self.assertEqual(self.decision_maker.get_task_status(task_b_id), TaskStatus.FAILED)
+
     def test_error_handling(self):
         def failing_task(context):
             raise ValueError("Task failed")
 
         task_id = self.decision_maker.add_task(failing_task)
-        self.decision_maker.start()
-        time.sleep(1)  # Allow some time for the task to execute
-        self.decision_maker.stop()
+        self.simulation.run()
         self.assertEqual(self.decision_maker.get_task_status(task_id), TaskStatus.FAILED)
         self.assertIsInstance(self.decision_maker.active_tasks[task_id].error, ValueError)
 
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from src.agent_a.decision_maker import DecisionMaker, TaskStatus
+from src.agent_a.journal import TaskJournal
+from src.agent_a.simulation import Simulation
+
+def journaled_task(context):
+    return context["value"] * 2
+
+class ClosingJournal(TaskJournal):
+    """Journal closed between the caller's check and its append, as stop(wait=False) can do"""
+    close_on_append = False
+
+    def append(self, record):
+        if self.close_on_append:
+            self.close()
+        return super().append(record)
+
+class TestTaskJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "tasks.journal")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_group_commit(self):
+        journal = TaskJournal(self.path)
+        for i in range(100):
+            seq = journal.append({"op": "status", "id": f"task_{i}", "status": "RUNNING"})
+        self.assertTrue(journal.wait(seq, timeout=5))
+        journal.close()
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 100)
+
+    def test_submission_is_durable_when_acknowledged(self):
+        decision_maker = DecisionMaker(journal=TaskJournal(self.path))
+        task_id = decision_maker.add_task(journaled_task, context={"value": 1})
+        plan = decision_maker.create_reasoning_plan("durable")
+        # Nothing has been closed or flushed by hand: the records are already on disk
+        reader = TaskJournal(self.path)
+        state = reader.replay()
+        reader.close()
+        self.assertIn(task_id, state.tasks)
+        self.assertIn(plan[0], state.plans)
+        decision_maker.stop()
+
+    def test_tasks_finishing_after_close_release_dependents(self):
+        simulation = Simulation(journal=ClosingJournal(self.path), forget_finished=False)
+        decision_maker = simulation.decision_maker
+        first = decision_maker.add_task(journaled_task, context={"value": 1})
+        second = decision_maker.add_task(journaled_task, context={"value": 2}, dependencies=[first])
+        finished = []
+        decision_maker.add_listener(lambda task: finished.append(task.id))
+        decision_maker.journal.close_on_append = True
+        simulation.run()
+        self.assertEqual(finished, [first, second])
+        self.assertEqual(decision_maker.get_task_result(second), 4)
+
+    def test_replay_ignores_torn_record(self):
+        journal = TaskJournal(self.path)
+        journal.append({"op": "plan", "id": "task_1", "query": "q", "tasks": ["task_1", "task_2"]})
+        journal.append({"op": "status", "id": "task_1", "status": "COMPLETED", "result": {"a": 1}})
+        journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"op":"status","id":"task_2"')  # Crash mid-write
+        reader = TaskJournal(self.path)
+        self.addCleanup(reader.close)
+        state = reader.replay()
+        self.assertEqual(state.records, 2)
+        self.assertEqual(state.tasks["task_1"]["status"], "COMPLETED")
+        self.assertEqual(state.tasks["task_2"]["status"], "PENDING")
+        self.assertEqual(state.max_task_number, 2)
+
+    def test_recovery_skips_completed_steps(self):
+        # Simulate a crash after the first two plan steps finished
+        journal = TaskJournal(self.path)
+        steps = ["task_1", "task_2", "task_3", "task_4"]
+        journal.append({"op": "plan", "id": "task_1", "query": "recover me", "tasks": steps})
+        journal.append({"op": "status", "id": "task_1", "status": "COMPLETED", "result": {"query_components": ["x"]}})
+        journal.append({"op": "status", "id": "task_2", "status": "COMPLETED", "result": {"additional_context": "y"}})
+        journal.append({"op": "status", "id": "task_3", "status": "RUNNING"})
+        journal.append({"op": "submit", "id": "task_5", "fn": f"{__name__}:journaled_task",
+                        "priority": 0, "deps": [], "context": {"value": 21}})
+        journal.close()
+
+        simulation = Simulation(journal=TaskJournal(self.path), forget_finished=False)
+        decision_maker = simulation.decision_maker
+        self.assertEqual(decision_maker.get_task_status("task_1"), TaskStatus.COMPLETED)
+        self.assertEqual(decision_maker.get_task_status("task_3"), TaskStatus.PENDING)
+        simulation.run()
+        decision_maker.stop()
+        for task_id in steps:
+            self.assertEqual(decision_maker.get_task_status(task_id), TaskStatus.COMPLETED)
+        self.assertEqual(decision_maker.get_task_result("task_5"), 42)
+        self.assertEqual(decision_maker.add_task(journaled_task, context={"value": 1}), "task_6")
+
+    def test_pending_tasks_survive_restart(self):
+        decision_maker = DecisionMaker(journal=TaskJournal(self.path))
+        task_ids = decision_maker.create_reasoning_plan("never started")
+        decision_maker.stop()  # Pending tasks are not journaled as failed
+
+        simulation = Simulation(journal=TaskJournal(self.path), forget_finished=False)
+        restored = simulation.decision_maker
+        simulation.run()
+        restored.stop()
+        for task_id in task_ids:
+            self.assertEqual(restored.get_task_status(task_id), TaskStatus.COMPLETED)
+
+    def test_compaction_drops_finished_work(self):
+        simulation = Simulation(journal=TaskJournal(self.path))
+        decision_maker = simulation.decision_maker
+        for _ in range(5):
+            decision_maker.create_reasoning_plan("finished")
+        simulation.run()
+        self.assertTrue(decision_maker.journal.wait(timeout=5))  # Status records written before compacting
+        decision_maker.journal.compact()
+        decision_maker.stop()
+        reader = TaskJournal(self.path)
+        self.addCleanup(reader.close)
+        self.assertEqual(reader.replay().records, 0)
+
+if __name__ == '__main__':
+    unittest.main()
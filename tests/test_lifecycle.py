@@ -0,0 +1,91 @@
+import threading
+import time
+import unittest
+from src.agent_a.core import AgentA
+from src.agent_a.decision_maker import DecisionMaker
+from src.agent_a.lifecycle import InFlight, start_parallel
+
+class TestStartParallel(unittest.TestCase):
+    def test_independent_steps_overlap(self):
+        def slow(value):
+            def step(_):
+                time.sleep(0.2)
+                return value
+            return step
+
+        timings = {}
+        started = time.monotonic()
+        results = start_parallel({
+            "a": (slow(1), ()),
+            "b": (slow(2), ()),
+            "sum": (lambda inputs: inputs["a"] + inputs["b"], ("a", "b")),
+        }, timings)
+
+        self.assertEqual(results["sum"], 3)
+        self.assertLess(time.monotonic() - started, 0.35)
+        self.assertEqual(set(timings), {"a", "b", "sum"})
+
+    def test_failure_skips_dependents(self):
+        ran = []
+
+        def fail(_):
+            raise OSError("disk gone")
+
+        with self.assertRaises(OSError):
+            start_parallel({
+                "journal": (fail, ()),
+                "decision_maker": (lambda inputs: ran.append("decision_maker"), ("journal",)),
+                "interpreter": (lambda _: ran.append("interpreter"), ()),
+            })
+        self.assertEqual(ran, ["interpreter"])
+
+class TestInFlight(unittest.TestCase):
+    def test_wait_idle(self):
+        decision_maker = DecisionMaker(max_workers=2, query_batch_window=None)
+        release = threading.Event()
+        in_flight = InFlight(decision_maker)
+        in_flight.add([decision_maker.add_task(lambda context: release.wait(5)) for _ in range(2)])
+        decision_maker.start()
+        try:
+            self.assertFalse(in_flight.wait_idle(0.05))
+            self.assertEqual(len(in_flight), 2)
+            release.set()
+            self.assertTrue(in_flight.wait_idle(5))
+        finally:
+            in_flight.close()
+            decision_maker.stop()
+
+class TestAgentLifecycle(unittest.TestCase):
+    def test_start_drain(self):
+        agent = AgentA()
+        timings = agent.start()
+        self.assertTrue(agent.lifecycle.ready.is_set())
+        self.assertIsNotNone(timings.ready)
+        self.assertIn("decision_maker", timings.components)
+
+        task_ids = agent.submit_command("drain me")
+        self.assertTrue(agent.drain(timeout=10))
+        for task_id in task_ids:
+            self.assertIsNotNone(agent.decision_maker.get_task_result(task_id))
+        self.assertIsNotNone(timings.drain)
+        self.assertIsNotNone(timings.shutdown)
+        self.assertTrue(agent.lifecycle.stopped.is_set())
+        with self.assertRaises(RuntimeError):
+            agent.submit_command("too late")
+
+    def test_drain_deadline(self):
+        agent = AgentA()
+        agent.start()
+        release = threading.Event()
+        agent.in_flight.add([agent.decision_maker.add_task(lambda context: release.wait(5))])
+        try:
+            started = time.monotonic()
+            self.assertFalse(agent.drain(timeout=0.1))
+            # Stopping does not wait for the straggler
+            self.assertLess(time.monotonic() - started, 1.0)
+            self.assertEqual(agent.lifecycle.timings.abandoned, 1)
+        finally:
+            release.set()
+
+if __name__ == '__main__':
+    unittest.main()
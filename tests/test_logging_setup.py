@@ -0,0 +1,89 @@
+import io
+import json
+import logging
+import unittest
+from unittest.mock import patch
+from src.agent_a.logging_setup import (
+    JsonFormatter, RateLimitFilter, SamplingFilter, configure_logging, shutdown_logging
+)
+
+class TestLoggingSetup(unittest.TestCase):
+    def tearDown(self):
+        shutdown_logging()
+        logging.getLogger("agent_a_test").handlers.clear()
+        logging.getLogger("agent_a_test.core").handlers.clear()
+
+    def test_sync_mode(self):
+        stream = io.StringIO()
+        logger = configure_logging("debug", logger_name="agent_a_test", stream=stream)
+        logger.debug("Task %s completed successfully", "task_1")
+        self.assertIn("Task task_1 completed successfully", stream.getvalue())
+
+    def test_async_mode_flushes_on_shutdown(self):
+        stream = io.StringIO()
+        logger = configure_logging("async", logger_name="agent_a_test", stream=stream)
+        for i in range(100):
+            logger.debug("Task %s completed successfully", i)
+        shutdown_logging()
+        self.assertEqual(len(stream.getvalue().splitlines()), 100)
+
+    def test_production_mode(self):
+        stream = io.StringIO()
+        logger = configure_logging("production", logger_name="agent_a_test", stream=stream)
+        logger.debug("Task %s completed successfully", "filtered")
+        for i in range(50):
+            logger.info("Task %s started", i)
+        logger.error("Task %s failed: %s", "task_9", "boom")
+        shutdown_logging()
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertFalse(any("filtered" in line["message"] for line in lines))
+        self.assertLess(len(lines), 50)  # Repetitive INFO lines are rate limited
+        self.assertEqual(lines[-1]["level"], "ERROR")
+
+    def test_reconfigure_replaces_previous_logger(self):
+        configure_logging("async", logger_name="agent_a_test", stream=io.StringIO())
+        stream = io.StringIO()
+        logger = configure_logging("debug", logger_name="agent_a_test.core", stream=stream)
+        self.assertEqual(logging.getLogger("agent_a_test").handlers, [])
+        logger.debug("Task %s completed successfully", "task_1")
+        self.assertEqual(len(stream.getvalue().splitlines()), 1)
+
+    def test_json_formatter_includes_extra(self):
+        record = logging.LogRecord("agent_a", logging.INFO, __file__, 1, "Task %s", ("t1",), None)
+        record.task_id = "t1"
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["message"], "Task t1")
+        self.assertEqual(entry["task_id"], "t1")
+
+    def test_rate_limit_filter(self):
+        rate_limit = RateLimitFilter(burst=3, interval=60)
+        make = lambda level: logging.LogRecord("agent_a", level, __file__, 1, "Task %s", ("t",), None)
+        passed = [rate_limit.filter(make(logging.INFO)) for _ in range(10)]
+        self.assertEqual(passed.count(True), 3)
+        self.assertTrue(rate_limit.filter(make(logging.ERROR)))
+
+    @patch("src.agent_a.logging_setup.time")
+    def test_rate_limit_prunes_idle_windows(self, mock_time):
+        mock_time.monotonic.return_value = 0.0
+        rate_limit = RateLimitFilter(burst=1, interval=1.0)
+        for i in range(100):
+            rate_limit.filter(logging.LogRecord("agent_a", logging.INFO, __file__, 1, f"Task {i}", (), None))
+        self.assertEqual(len(rate_limit._windows), 100)
+        mock_time.monotonic.return_value = 2.0
+        rate_limit.filter(logging.LogRecord("agent_a", logging.INFO, __file__, 1, "Task %s", ("t",), None))
+        self.assertEqual(len(rate_limit._windows), 1)
+
+    def test_sampling_filter_bounds_keys(self):
+        sampling = SamplingFilter(every=10, max_keys=50)
+        for i in range(1000):
+            self.assertTrue(sampling.filter(
+                logging.LogRecord("agent_a", logging.DEBUG, __file__, 1, f"Task {i}", (), None)))
+        self.assertLessEqual(len(sampling._counts), 50)
+
+    def test_sampling_filter(self):
+        sampling = SamplingFilter(every=10)
+        record = logging.LogRecord("agent_a", logging.DEBUG, __file__, 1, "Task %s", ("t",), None)
+        self.assertEqual(sum(sampling.filter(record) for _ in range(100)), 10)
+
+if __name__ == '__main__':
+    unittest.main()
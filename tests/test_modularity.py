@@ -75,6 +75,21 @@ class TestModularity(unittest.TestCase):
         self.modularity.extend()
         self.assertEqual(self.modularity.context.get("key"), "value")
 
+    def test_scoped_context(self):
+        self.modularity.context.set("shared", "global")
+
+        def sample_module(context):
+            context.set("key", context.get("request") + "_" + context.get("shared"))
+        self.modularity.register_module(Module(name="sample", execute=sample_module))
+
+        first = self.modularity.context.scope({"request": "first"})
+        second = self.modularity.context.scope({"request": "second"})
+        self.modularity.extend(first)
+        self.modularity.extend(second)
+        self.assertEqual(first.get("key"), "first_global")
+        self.assertEqual(second.get("key"), "second_global")
+        self.assertIsNone(self.modularity.context.get("key"))
+
     def test_error_handling(self):
         def failing_module(context):
             raise ValueError("Module failed")
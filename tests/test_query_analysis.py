@@ -0,0 +1,62 @@
+import time
+import unittest
+from unittest.mock import patch
+from src.agent_a import query_analysis
+from src.agent_a.query_analysis import QueryBatcher, analyze_queries, analyze_query
+from src.agent_a.decision_maker import DecisionMaker, TaskStatus
+
+class TestQueryAnalysis(unittest.TestCase):
+    def test_batch_matches_single_query_path(self):
+        queries = ["Translate: Hello World", "", "  spaced   out ", "naïve café, HTTP/2?", "a_b 42"]
+        self.assertEqual(analyze_queries(queries), [analyze_query(q) for q in queries])
+
+    def test_large_batches_do_not_grow_cached_tables(self):
+        queries = ["Translate: Hello World", "naïve café, HTTP/2?"] * 20
+        expected = [analyze_query(q) for q in queries]
+        small = query_analysis._build_power_tables(8)
+        with patch.object(query_analysis, "_MAX_CACHED_POWERS", 64), \
+                patch.object(query_analysis, "_powers", small[0]), \
+                patch.object(query_analysis, "_inv_powers", small[1]):
+            self.assertEqual(analyze_queries(queries), expected)
+            self.assertLessEqual(len(query_analysis._powers), 64)
+
+    def test_components(self):
+        result = analyze_query("Find the Latest REPORT")
+        self.assertEqual(result['query_components'], ["find", "the", "latest", "report"])
+        self.assertEqual(len(result['query_features']), 4)
+        self.assertTrue(all(0 <= f < 1 << 20 for f in result['query_features']))
+
+    def test_batcher_groups_queries(self):
+        batch_sizes = []
+
+        def analyze(queries):
+            batch_sizes.append(len(queries))
+            return analyze_queries(queries)
+
+        batcher = QueryBatcher(analyze=analyze, max_batch=64, window=0.05)
+        futures = [batcher.submit(f"query number {i}") for i in range(40)]
+        results = [future.result(timeout=5) for future in futures]
+        batcher.close()
+
+        self.assertEqual(results, analyze_queries([f"query number {i}" for i in range(40)]))
+        self.assertLess(len(batch_sizes), 40)
+
+    def test_plans_get_their_own_components(self):
+        decision_maker = DecisionMaker(query_batch_window=0.01)
+        decision_maker.start()
+        try:
+            plans = {f"plan {i} topic{i}": decision_maker.create_reasoning_plan(f"plan {i} topic{i}")
+                     for i in range(10)}
+            deadline = time.time() + 5
+            for task_ids in plans.values():
+                while decision_maker.get_task_status(task_ids[-1]) != TaskStatus.COMPLETED:
+                    self.assertLess(time.time(), deadline)
+                    time.sleep(0.01)
+            for query, task_ids in plans.items():
+                result = decision_maker.get_task_result(task_ids[0])
+                self.assertEqual(result['query_components'], query.split())
+        finally:
+            decision_maker.stop()
+
+if __name__ == '__main__':
+    unittest.main()
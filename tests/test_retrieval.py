@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from src.agent_a.retrieval import BM25Index
+from src.agent_a.decision_maker import DecisionMaker, TaskStatus
+
+DOCS = [
+    "the quick brown fox",
+    "jumps over the lazy dog",
+    "a fox and a dog",
+    "database indexes and query planning",
+    "fox fox fox den",
+]
+
+class TestBM25Index(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def test_search_ranks_matching_documents(self):
+        index = BM25Index(self.path)
+        index.add_documents(DOCS)
+        index.flush()
+
+        hits = index.search("fox dog", k=3)
+        self.assertEqual(hits[0]["doc_id"], 2)
+        self.assertEqual(hits[0]["text"], DOCS[2])
+        self.assertEqual(len(hits), 3)
+        self.assertTrue(all(a["score"] >= b["score"] for a, b in zip(hits, hits[1:])))
+        self.assertEqual(index.search("nothing matches"), [])
+
+    def test_incremental_segments_and_merge(self):
+        index = BM25Index(self.path)
+        index.add_documents(DOCS[:3])
+        index.flush()
+        ids = index.add_documents(DOCS[3:])
+        index.flush()
+        self.assertEqual(ids, [3, 4])
+        self.assertEqual(len(index), 5)
+
+        before = index.search("fox database", k=5)
+        index.merge()
+        self.assertEqual(sorted(os.listdir(self.path)), ["manifest.json", "seg_000003"])
+        after = index.search("fox database", k=5)
+        self.assertEqual([h["doc_id"] for h in before], [h["doc_id"] for h in after])
+        for a, b in zip(before, after):
+            self.assertAlmostEqual(a["score"], b["score"])
+
+    def test_merge_matches_single_segment(self):
+        docs = [f"{text} item{i % 7}" for i in range(40) for text in DOCS[i % 5:i % 5 + 1]]
+        single = BM25Index(os.path.join(self.path, "single"))
+        single.add_documents(docs)
+        single.flush()
+
+        index = BM25Index(os.path.join(self.path, "merged"))
+        for first in range(0, len(docs), 6):
+            index.add_documents(docs[first:first + 6])
+            index.flush()
+        # Tiny blocks and byte chunks, so both loops take many steps
+        with patch("src.agent_a.retrieval._MERGE_POSTINGS", 5), \
+                patch("src.agent_a.retrieval._COPY_BYTES", 7), \
+                patch("src.agent_a.retrieval._TOKENIZE_BYTES", 50):
+            index.merge()
+        self.assertEqual(len(index._segments), 1)
+        for query in ("fox dog item3", "database planning", "lazy item0 den"):
+            expected = single.search(query, k=10)
+            hits = index.search(query, k=10)
+            self.assertEqual([h["doc_id"] for h in expected], [h["doc_id"] for h in hits])
+            self.assertEqual([h["text"] for h in expected], [h["text"] for h in hits])
+            for a, b in zip(expected, hits):
+                self.assertAlmostEqual(a["score"], b["score"])
+
+    def test_reopen_maps_existing_index(self):
+        index = BM25Index(self.path)
+        index.add_documents(DOCS)
+        index.flush()
+
+        reopened = BM25Index(self.path)
+        self.assertEqual(len(reopened), len(DOCS))
+        self.assertEqual(reopened.search("query planning", k=1)[0]["doc_id"], 3)
+
+    def test_search_sees_segments_added_elsewhere(self):
+        index = BM25Index(self.path)
+        index.add_documents(DOCS[:3])
+        index.flush()
+        self.assertEqual(index.search("database", k=1), [])
+
+        writer = BM25Index(self.path)  # e.g. python -m agent_a.retrieval DIR --add
+        writer.add_documents(DOCS[3:])
+        writer.flush()
+        self.assertEqual(index.search("database", k=1)[0]["doc_id"], 3)
+
+        writer.merge()
+        self.assertEqual(index.search("database", k=1)[0]["text"], DOCS[3])
+        self.assertEqual(len(index), len(DOCS))
+
+    def test_two_writers(self):
+        first = BM25Index(self.path)
+        second = BM25Index(self.path)  # Opened before the first writer adds anything
+        first.add_documents(DOCS[:2])
+        first.flush()
+        second.add_documents(DOCS[2:4])
+        second.flush()
+        first.add_documents(DOCS[4:])
+        first.flush()
+
+        reopened = BM25Index(self.path)
+        self.assertEqual(len(reopened), len(DOCS))
+        self.assertEqual(reopened.search("query planning", k=1)[0]["text"], DOCS[3])
+        self.assertFalse([name for name in os.listdir(self.path) if name.endswith(".tmp")])
+
+    def test_failed_flush_keeps_pending_documents(self):
+        index = BM25Index(self.path)
+        index.add_documents(DOCS)
+        with patch("src.agent_a.retrieval.np.save", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                index.flush()
+        self.assertEqual(sorted(os.listdir(self.path)), [])
+        index.flush()
+        self.assertEqual(len(BM25Index(self.path)), len(DOCS))
+
+    def test_gather_context_returns_top_k(self):
+        index = BM25Index(self.path)
+        index.add_documents(DOCS)
+        index.flush()
+
+        decision_maker = DecisionMaker(retriever=index, retrieval_k=2)
+        decision_maker.start()
+        try:
+            task_ids = decision_maker.create_reasoning_plan("lazy dog")
+            deadline = time.time() + 5
+            while decision_maker.get_task_status(task_ids[1]) != TaskStatus.COMPLETED:
+                self.assertLess(time.time(), deadline)
+                time.sleep(0.01)
+            snippets = decision_maker.get_task_result(task_ids[1])["additional_context"]
+            self.assertEqual(len(snippets), 2)
+            self.assertEqual(snippets[0]["text"], DOCS[1])
+        finally:
+            decision_maker.stop()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import unittest
+from src.agent_a.core import AgentA
+from src.agent_a.server import AgentServer
+
+class TestAgentServer(unittest.TestCase):
+    def setUp(self):
+        self.agent = AgentA()
+        self.agent.initialize_components()
+        self.agent.decision_maker.start()
+
+    def tearDown(self):
+        self.agent.stop()
+
+    async def _request(self, server, commands):
+        host, port = server.address[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        for i, command in enumerate(commands):
+            writer.write(json.dumps({"id": i, "command": command}).encode() + b"\n")
+        await writer.drain()
+
+        events = []
+        done = set()
+        while len(done) < len(commands):
+            message = json.loads(await reader.readline())
+            events.append(message)
+            if message["event"] in ("done", "error"):
+                done.add(message["id"])
+        writer.close()
+        return events
+
+    def test_pipelined_requests_stream_results(self):
+        async def scenario():
+            server = AgentServer(self.agent, port=0)
+            await server.start()
+            events = await self._request(server, ["first", "second", "third"])
+            await server.drain()
+            return events
+
+        events = asyncio.run(scenario())
+        for request_id in range(3):
+            own = [e for e in events if e["id"] == request_id]
+            self.assertEqual(own[0]["event"], "accepted")
+            self.assertEqual(own[-1]["event"], "done")
+            steps = [e for e in own if e["event"] == "step"]
+            self.assertEqual(len(steps), len(own[0]["task_ids"]))
+            self.assertTrue(all(e["status"] == "COMPLETED" for e in steps))
+        # Finished requests are not kept around
+        self.assertEqual(self.agent.decision_maker.active_tasks, {})
+
+    def test_connection_limit(self):
+        async def scenario():
+            server = AgentServer(self.agent, port=0, max_connections=1)
+            await server.start()
+            host, port = server.address[:2]
+            first = await asyncio.open_connection(host, port)
+            await asyncio.sleep(0.05)
+            reader, writer = await asyncio.open_connection(host, port)
+            message = json.loads(await reader.readline())
+            writer.close()
+            first[1].close()
+            await server.drain()
+            return message
+
+        message = asyncio.run(scenario())
+        self.assertEqual(message["event"], "error")
+
+    def test_drain_finishes_inflight_requests(self):
+        async def scenario():
+            server = AgentServer(self.agent, port=0)
+            await server.start()
+            request = asyncio.ensure_future(self._request(server, ["drain me"]))
+            await asyncio.sleep(0.05)
+            await server.drain()
+            return await request
+
+        events = asyncio.run(scenario())
+        self.assertEqual(events[-1]["event"], "done")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from src.agent_a.simulation import Simulation, constant, exponential
+
+class TestSimulation(unittest.TestCase):
+    def test_same_seed_same_report(self):
+        def run():
+            simulation = Simulation(max_workers=2, duration=exponential(1.0), seed=7, sample_interval=600)
+            simulation.poisson_arrivals(5000, 2, priorities=[0, 1, 5])
+            report = simulation.run()
+            report.wall_seconds = 0
+            return report
+
+        self.assertEqual(run(), run())
+
+    def test_priority_order(self):
+        simulation = Simulation(max_workers=1, duration=constant(1.0))
+        finished = []
+        simulation.decision_maker.add_listener(lambda task: finished.append(task.priority))
+        for priority in [1, 5, 3]:
+            simulation.add_task(0.0, priority=priority)
+        report = simulation.run()
+
+        # All three arrive before the first dispatch, so they run highest first
+        self.assertEqual(finished, [5, 3, 1])
+        self.assertEqual(report.virtual_seconds, 3.0)
+        self.assertEqual(report.latency["max"], 3.0)
+
+    def test_timeout_keeps_worker_busy(self):
+        simulation = Simulation(max_workers=1, task_timeout=5, duration=constant(1.0))
+        simulation.add_task(0.0, duration=10.0)
+        simulation.add_task(1.0, duration=1.0)
+        report = simulation.run()
+
+        self.assertEqual(report.timed_out, 1)
+        self.assertEqual(report.completed, 1)
+        # The timed-out task fails at t=5 but holds its slot until t=10
+        self.assertEqual(report.wait["max"], 9.0)
+        self.assertEqual(report.latency["max"], 10.0)
+        self.assertEqual(report.virtual_seconds, 11.0)
+
+    def test_day_of_traffic_utilization(self):
+        simulation = Simulation(max_workers=2, duration=constant(1.0), sample_interval=3600)
+        simulation.poisson_arrivals(1800, 24)
+        report = simulation.run()
+
+        self.assertGreater(report.virtual_seconds, 23 * 3600)
+        self.assertAlmostEqual(report.utilization, 0.25, delta=0.02)
+        self.assertGreaterEqual(len(report.queue_depth), 24)
+        self.assertEqual(report.failed, 0)
+
+if __name__ == '__main__':
+    unittest.main()
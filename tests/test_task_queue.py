@@ -0,0 +1,76 @@
+import queue
+import threading
+import unittest
+from src.agent_a.task_queue import IndexedPriorityQueue
+from src.agent_a.decision_maker import TaskStatus
+from src.agent_a.simulation import Simulation, constant
+
+class TestIndexedPriorityQueue(unittest.TestCase):
+    def test_priority_then_fifo(self):
+        q = IndexedPriorityQueue()
+        for task_id, priority in [("a", 1), ("b", 5), ("c", 1), ("d", 5)]:
+            q.put(task_id, task_id.upper(), priority)
+        self.assertEqual([q.get_nowait() for _ in range(4)], ["B", "D", "A", "C"])
+        self.assertRaises(queue.Empty, q.get_nowait)
+
+    def test_reprioritize_and_cancel(self):
+        q = IndexedPriorityQueue()
+        for i in range(5):
+            q.put(f"t{i}", i, priority=0)
+        self.assertTrue(q.reprioritize("t3", 10))
+        self.assertEqual(q.cancel("t0"), 0)
+        self.assertIsNone(q.cancel("t0"))
+        self.assertFalse(q.reprioritize("missing", 1))
+
+        self.assertEqual(q.peek(), ("t3", 10, 3))
+        self.assertEqual([entry[0] for entry in q.snapshot()], ["t3", "t1", "t2", "t4"])
+        self.assertEqual([entry[0] for entry in q.snapshot(limit=2)], ["t3", "t1"])
+        self.assertEqual(len(q), 4)
+        self.assertEqual(q.drain(), [3, 1, 2, 4])
+        self.assertTrue(q.empty())
+
+    def test_many_removals_compact_heap(self):
+        q = IndexedPriorityQueue()
+        for i in range(10000):
+            q.put(f"t{i}", i, priority=i % 7)
+        for i in range(10000):
+            if i % 4:
+                q.cancel(f"t{i}")
+        self.assertLess(len(q._heap), 10000)
+        items = [q.get_nowait() for _ in range(len(q))]
+        self.assertEqual(len(items), 2500)
+        self.assertTrue(all(i % 4 == 0 for i in items))
+
+    def test_get_blocks_until_put(self):
+        q = IndexedPriorityQueue()
+        threading.Timer(0.05, q.put, args=("late", "item")).start()
+        self.assertEqual(q.get(timeout=2), "item")
+        self.assertRaises(queue.Empty, q.get, timeout=0.01)
+
+class TestDecisionMakerQueueControl(unittest.TestCase):
+    def setUp(self):
+        self.simulation = Simulation(max_workers=1, duration=constant(1.0), forget_finished=False)
+        self.decision_maker = self.simulation.decision_maker
+
+    def test_cancel_pending_task_fails_dependents(self):
+        first = self.decision_maker.add_task(lambda ctx: None)
+        second = self.decision_maker.add_task(lambda ctx: None, dependencies=[first])
+        self.assertTrue(self.decision_maker.cancel_task(first))
+        self.assertEqual(self.decision_maker.get_task_status(first), TaskStatus.FAILED)
+
+        self.simulation.run()
+        self.assertEqual(self.decision_maker.get_task_status(second), TaskStatus.FAILED)
+        self.assertFalse(self.decision_maker.cancel_task(first))
+
+    def test_reprioritize_changes_dispatch_order(self):
+        order = []
+        low = self.decision_maker.add_task(lambda ctx: order.append("low"), priority=1)
+        self.decision_maker.add_task(lambda ctx: order.append("high"), priority=5)
+        self.assertTrue(self.decision_maker.reprioritize_task(low, 10))
+        self.assertEqual([t['id'] for t in self.decision_maker.get_pending_tasks()][0], low)
+
+        self.simulation.run()
+        self.assertEqual(order, ["low", "high"])
+
+if __name__ == '__main__':
+    unittest.main()